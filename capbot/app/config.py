@@ -5,6 +5,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict
 
+from capbot.domain.state_store import loads_json
+
 
 @dataclass(frozen=True)
 class BotConfig:
@@ -42,7 +44,7 @@ def load_config(path: str) -> BotConfig:
         raise FileNotFoundError(f"Config file not found: {p}")
 
     try:
-        raw = json.loads(p.read_text(encoding="utf-8"))
+        raw = loads_json(p.read_bytes())
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in config {p}: {e}") from e
 
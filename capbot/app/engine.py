@@ -1,4 +1,5 @@
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
 
 import pandas as pd
 import numpy as np
@@ -29,16 +30,17 @@ except Exception:
     def telegram_event(*args, **kwargs):
         return None
 
-from capbot.broker.capital_client import CapitalClient, pick_position_dealid_from_confirm
+from capbot.broker.capital_client import CapitalClient, pick_position_dealid_from_confirm, to_number
 from capbot.data.prices import prices_to_df
 from capbot.domain.lock import InstanceLock
 from capbot.domain.logger import log_line
 from capbot.domain.paths import bot_paths
 from capbot.domain.risk import calc_position_size
-from capbot.domain.schedule import RTH
+from capbot.domain.schedule import RTH, utc_offset_ns
 from capbot.domain.state_store import load_state, save_state_atomic
 from capbot.domain.trade_log import append_row, ensure_header
 from capbot.domain.trailing import maybe_trail_option_a
+from capbot.strategies._kernels import warmup as kernels_warmup
 from capbot.strategies.loader import load_strategy
 
 
@@ -59,6 +61,12 @@ def _as_ts(x: Optional[str]) -> Optional[pd.Timestamp]:
         return None
 
 
+def _set_cooldown(st: Dict[str, Any], until: pd.Timestamp) -> None:
+    """Circuit-breaker end as ISO (read by the engine) and epoch seconds (cheap for health checks)."""
+    st["cooldown_until_iso"] = until.isoformat()
+    st["cooldown_until_epoch"] = until.timestamp()
+
+
 def _resolution_to_minutes(resolution: str) -> int:
     r = (resolution or "").upper().strip()
     if r.startswith("MINUTE_"):
@@ -75,19 +83,31 @@ def _resolution_to_minutes(resolution: str) -> int:
     return 5
 
 
+_NS_PER_MIN = 60_000_000_000
+_NS_PER_DAY = 1440 * _NS_PER_MIN
+
+
+@lru_cache(maxsize=8)
+def _rth_checker(rth: RTH) -> Callable[[pd.Timestamp], bool]:
+    """
+    RTH check specialised for one (immutable) RTH: the bounds become
+    ns-of-day ints once, and each call is offset lookup + integer compares.
+    """
+    tz_name = str(getattr(rth, "tz_name", "UTC"))
+    start_ns = (int(getattr(rth, "start_hh", 0)) * 60 + int(getattr(rth, "start_mm", 0))) * _NS_PER_MIN
+    end_ns = (int(getattr(rth, "end_hh", 23)) * 60 + int(getattr(rth, "end_mm", 59))) * _NS_PER_MIN
+
+    def is_open(ts: pd.Timestamp) -> bool:
+        ns = ts.value
+        days, tod_ns = divmod(ns + utc_offset_ns(tz_name, ns), _NS_PER_DAY)
+        # local weekday: day 0 (1970-01-01) was a Thursday; Sat/Sun closed
+        return (days + 3) % 7 < 5 and start_ns <= tod_ns <= end_ns
+
+    return is_open
+
+
 def _rth_is_open(rth: RTH, ts: pd.Timestamp) -> bool:
-    import pytz
-    tz = pytz.timezone(getattr(rth, "tz_name", "UTC"))
-    local = ts.tz_convert(tz)
-    if local.weekday() >= 5:
-        return False
-    sh = int(getattr(rth, "start_hh", 0))
-    sm = int(getattr(rth, "start_mm", 0))
-    eh = int(getattr(rth, "end_hh", 23))
-    em = int(getattr(rth, "end_mm", 59))
-    start = local.replace(hour=sh, minute=sm, second=0, microsecond=0)
-    end = local.replace(hour=eh, minute=em, second=0, microsecond=0)
-    return start <= local <= end
+    return _rth_checker(rth)(ts)
 
 
 def _to_utc_ts(x):
@@ -185,6 +205,10 @@ def _ensure_utc_datetime_index_safe(df):
 
     try:
         if isinstance(df.index, pd.DatetimeIndex):
+            idx = df.index
+            # Already sorted UTC: nothing to normalise, skip the copy
+            if idx.tz is not None and str(idx.tz) == "UTC" and idx.is_monotonic_increasing:
+                return df
             d = df.copy()
             if d.index.tz is None:
                 d.index = d.index.tz_localize("UTC")
@@ -196,16 +220,14 @@ def _ensure_utc_datetime_index_safe(df):
 
     try:
         if "time" in getattr(df, "columns", []):
-            d = df.copy()
-            t = pd.to_datetime(d["time"], utc=True, errors="coerce")
+            t = pd.to_datetime(df["time"], utc=True, errors="coerce")
             try:
                 all_bad = t.isna().all()
             except Exception:
                 all_bad = False
             if all_bad:
                 return df
-            d["time"] = t
-            d = d.dropna(subset=["time"]).set_index("time").sort_index()
+            d = df.assign(time=t).dropna(subset=["time"]).set_index("time").sort_index()
             return d if not getattr(d, "empty", True) else df
     except Exception:
         return df
@@ -232,6 +254,15 @@ def _fetch_broker_open_snap(client, epic: str, deal_id: str):
     return snap
 
 
+def _first_activity_for_deal(activity: Dict[str, Any], deal_id) -> Optional[Dict[str, Any]]:
+    """First history activity whose dealId contains deal_id (stops at the first hit)."""
+    want = str(deal_id)
+    return next(
+        (a for a in (activity.get("activities") or []) if a and want in str(a.get("dealId") or "")),
+        None,
+    )
+
+
 def _fetch_broker_history_snap(client):
     """Best-effort history snapshot. Never raises."""
     try:
@@ -371,7 +402,7 @@ def _compute_vis_checks(df, strat_params, rth, rth_enabled, tz_name, now,
     rth_ok = (not rth_enabled) or _rth_is_open(rth, now)
     try:
         now_local = now.tz_convert(tz_name)
-        nth_block = int(now_local.hour) in set(int(x) for x in no_trade_hours)
+        nth_block = int(now_local.hour) in no_trade_hours
     except Exception:
         nth_block = False
     cooldown_until = _as_ts((st or {}).get("cooldown_until_iso"))
@@ -483,7 +514,7 @@ def _handle_position_exit(client, st, pos, deal_id, direction, reason, exit_pric
             if close_conf:
                 log_line(logfile, f"BROKER_CLOSE_CONFIRM_FULL: {json.dumps(close_conf)[:500]}")
                 if close_conf.get("profit") is not None:
-                    confirm_profit = round(float(close_conf["profit"]), 2)
+                    confirm_profit = round(to_number(close_conf["profit"]), 2)
                     log_line(logfile, f"BROKER_CONFIRM_PROFIT: {confirm_profit}")
                     # Only use confirm profit as FALLBACK - UPL (pre-close) is the
                     # exact value Capital.com shows.  Confirm profit can differ due
@@ -541,7 +572,7 @@ def _handle_position_exit(client, st, pos, deal_id, direction, reason, exit_pric
         consec = (consec + 1) if profit_cash < 0 else 0
         st["consec_losses"] = consec
         if consec >= cb_losses:
-            st["cooldown_until_iso"] = (now + pd.Timedelta(minutes=cb_cooldown)).isoformat()
+            _set_cooldown(st, now + pd.Timedelta(minutes=cb_cooldown))
             log_line(logfile, f"CIRCUIT_BREAKER: {consec} consecutive losses, cooldown {cb_cooldown}min")
     except Exception as e:
         log_line(logfile, f"CIRCUIT_BREAKER calc warning: {repr(e)}")
@@ -800,6 +831,11 @@ def run_bot(cfg: Dict[str, Any], once: bool = False):
         or schedule_cfg.get("no_trade_hours_berlin")
         or [9, 14, 15]
     )
+    # Checked every bar by the gates below; build the set once
+    try:
+        no_trade_hours = frozenset(int(x) for x in no_trade_hours)
+    except (TypeError, ValueError):
+        no_trade_hours = frozenset()
 
     # ── Risk ──
     risk_cfg = cfg.get("risk") or {}
@@ -825,6 +861,8 @@ def run_bot(cfg: Dict[str, Any], once: bool = False):
     strategy_cfg = cfg.get("strategy") or {}
     strat = load_strategy(strategy_cfg.get("module"))
     strat_params = strategy_cfg.get("params") or {}
+    # Compile/cache-load the numba kernels now, not on the first live enrich
+    kernels_warmup()
 
     # ── Account ──
     account_cfg = cfg.get("account") or {}
@@ -843,7 +881,10 @@ def run_bot(cfg: Dict[str, Any], once: bool = False):
 
     # ── Config hot-reload tracking ──
     config_path = cfg.get("_config_path") or ""
-    config_mtime = os.path.getmtime(config_path) if config_path and os.path.exists(config_path) else 0.0
+    try:
+        config_mtime = os.path.getmtime(config_path) if config_path else 0.0
+    except OSError:
+        config_mtime = 0.0
 
     # ── Graceful shutdown ──
     _shutdown_flag.clear()
@@ -1023,16 +1064,14 @@ def run_bot(cfg: Dict[str, Any], once: bool = False):
                         time.sleep(0.5)
                         activity = client.get_history_activity(max_items=10)
                         log_line(logfile, f"RECONCILE_ACTIVITY: {json.dumps(activity)[:500]}")
-                        for act in (activity.get("activities") or []):
-                            act_deal = str((act or {}).get("dealId") or "")
-                            if str(state_deal) in act_deal:
-                                source = str((act or {}).get("source") or "").upper()
-                                if source == "TP":
-                                    rec_reason = "EXIT_TP"
-                                elif source == "SL":
-                                    rec_reason = "EXIT_SL"
-                                log_line(logfile, f"RECONCILE_ACTIVITY_MATCH: dealId={act_deal} source={source}")
-                                break
+                        act = _first_activity_for_deal(activity, state_deal)
+                        if act is not None:
+                            source = str(act.get("source") or "").upper()
+                            if source == "TP":
+                                rec_reason = "EXIT_TP"
+                            elif source == "SL":
+                                rec_reason = "EXIT_SL"
+                            log_line(logfile, f"RECONCILE_ACTIVITY_MATCH: dealId={act.get('dealId')} source={source}")
                     except Exception as e2:
                         log_line(logfile, f"RECONCILE_ACTIVITY warning: {repr(e2)}")
 
@@ -1097,7 +1136,7 @@ def run_bot(cfg: Dict[str, Any], once: bool = False):
                     consec = (consec + 1) if profit_cash < 0 else 0
                     st["consec_losses"] = consec
                     if consec >= cb_losses:
-                        st["cooldown_until_iso"] = (now + pd.Timedelta(minutes=cb_cooldown)).isoformat()
+                        _set_cooldown(st, now + pd.Timedelta(minutes=cb_cooldown))
                         log_line(logfile, f"CIRCUIT_BREAKER: {consec} consecutive losses (broker exit), cooldown {cb_cooldown}min")
 
                     # Notify
@@ -1375,7 +1414,7 @@ def run_bot(cfg: Dict[str, Any], once: bool = False):
         # ── Gate 3: No-trade hours ──
         try:
             now_local = now.tz_convert(tz_name)
-            if int(now_local.hour) in set(int(x) for x in no_trade_hours):
+            if int(now_local.hour) in no_trade_hours:
                 log_line(logfile, f"GATE: NO_TRADE_HOURS hour={now_local.hour}")
                 if once:
                     return
@@ -1488,16 +1527,14 @@ def run_bot(cfg: Dict[str, Any], once: bool = False):
         # Method 2: Confirm via deal reference
         deal_id = broker_deal_id
         conf = {}
-        if deal_ref and (time.monotonic() - fill_t0 < fill_timeout):
-            for _i in range(3):
-                if time.monotonic() - fill_t0 > fill_timeout:
-                    break
-                conf = client.confirm(str(deal_ref), timeout_sec=min(15, fill_timeout)) or {}
-                did = pick_position_dealid_from_confirm(conf)
-                if did:
-                    deal_id = did
-                    break
-                time.sleep(1)
+        fill_left = fill_timeout - (time.monotonic() - fill_t0)
+        if deal_ref and fill_left > 0:
+            # confirm() already polls until ACCEPTED/REJECTED (retrying transient errors);
+            # give it the whole remaining fill budget so FILL_TIMEOUT below can still fire
+            conf = client.confirm(str(deal_ref), timeout_sec=fill_left) or {}
+            did = pick_position_dealid_from_confirm(conf)
+            if did:
+                deal_id = did
 
         # CRITICAL: Always track position if it exists on broker
         if not deal_id and confirmed_via_broker:
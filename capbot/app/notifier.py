@@ -1,5 +1,8 @@
 from __future__ import annotations
 from pathlib import Path
+import atexit
+import queue
+import threading
 import time
 
 import logging
@@ -57,7 +60,7 @@ def _should_dedupe_startup(bot_id: str, event: str, cooldown_sec: int | None = N
         return False
     now = int(time.time())
     try:
-        data = json.loads(_DEDUPE_PATH.read_text(encoding="utf-8")) if _DEDUPE_PATH.exists() else {}
+        data = json.loads(_DEDUPE_PATH.read_text(encoding="utf-8"))
     except Exception:
         data = {}
     key = f"{bot_id}:{event}"
@@ -107,6 +110,114 @@ def _build_email_meta(bot_id: str, event: str, *, logfile: str = "", cfg=None) -
     }
 
 
+# --- SMTP connection reuse ---
+# One logged-in connection per process, reused while it is fresher than
+# _SMTP_IDLE_SEC (servers typically drop idle sessions after ~5 min).
+_SMTP_IDLE_SEC = 240.0
+_smtp_lock = threading.Lock()
+_smtp_client = None
+_smtp_key: tuple = ()
+_smtp_expires = 0.0
+
+
+def _smtp_close() -> None:
+    global _smtp_client
+    s, _smtp_client = _smtp_client, None
+    if s is not None:
+        try:
+            s.quit()
+        except Exception:
+            try:
+                s.close()
+            except Exception:
+                pass
+
+
+def _smtp_send(host: str, port: int, user: str, pwd: str, msg) -> None:
+    """send_message over the shared connection; (re)connects as needed. Raises on failure."""
+    import smtplib, ssl
+    global _smtp_client, _smtp_key, _smtp_expires
+
+    key = (host, port, user, pwd)
+    with _smtp_lock:
+        for attempt in (0, 1):
+            reused = _smtp_client is not None and _smtp_key == key and time.monotonic() < _smtp_expires
+            if not reused:
+                _smtp_close()
+                s = smtplib.SMTP(host, port, timeout=25)
+                try:
+                    s.ehlo()
+                    if port in (587, 25):
+                        s.starttls(context=ssl.create_default_context())
+                        s.ehlo()
+                    s.login(user, pwd)
+                except Exception:
+                    s.close()
+                    raise
+                _smtp_client, _smtp_key = s, key
+            try:
+                _smtp_client.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                _smtp_close()
+                if reused and attempt == 0:
+                    continue  # stale pooled connection: one retry on a fresh one
+                raise
+            except Exception:
+                _smtp_close()
+                raise
+            _smtp_expires = time.monotonic() + _SMTP_IDLE_SEC
+            return
+# --- end SMTP reuse ---
+
+
+# --- background sending ---
+# email_event() only builds the message and enqueues it; one daemon thread
+# does the SMTP work so the trading loop never waits on the network.
+_mail_q: "queue.Queue[tuple]" = queue.Queue(maxsize=1024)
+_mail_worker = None
+_mail_worker_lock = threading.Lock()
+
+
+def _mail_drain() -> None:
+    while True:
+        host, port, user, pwd, msg = _mail_q.get()
+        try:
+            _smtp_send(host, port, user, pwd, msg)
+            log.info("EMAIL_SENT to=%s subj=%s", msg["To"], msg["Subject"])
+        except Exception as e:
+            log.exception("EMAIL_FAILED: %r", e)
+        finally:
+            _mail_q.task_done()
+
+
+def _mail_enqueue(host: str, port: int, user: str, pwd: str, msg) -> bool:
+    global _mail_worker
+    with _mail_worker_lock:
+        if _mail_worker is None or not _mail_worker.is_alive():
+            _mail_worker = threading.Thread(target=_mail_drain, name="capbot-email", daemon=True)
+            _mail_worker.start()
+    try:
+        _mail_q.put_nowait((host, port, user, pwd, msg))
+    except queue.Full:
+        log.warning("EMAIL_DROPPED queue full subj=%s", msg["Subject"])
+        return False
+    return True
+
+
+def flush_emails(timeout: float = 30.0) -> bool:
+    """Block until queued emails are sent (or timeout). Runs at interpreter exit."""
+    deadline = time.monotonic() + float(timeout)
+    while _mail_q.unfinished_tasks:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+atexit.register(flush_emails)
+# --- end background sending ---
+
+
 def email_event(ok: bool, bot_id: str, event: str, payload: Any, logfile: str = "", cfg=None) -> bool:
     """
     SMTP email sender.
@@ -117,9 +228,11 @@ def email_event(ok: bool, bot_id: str, event: str, payload: Any, logfile: str =
       EMAIL_FROM (defaults to EMAIL_TO)
 
     IMPORTANT: Never raise to caller (do not break trading loop).
-    Returns True if sent, False otherwise.
+    Sending happens on a background thread: returns True once the message
+    is queued (EMAIL_SENT / EMAIL_FAILED are logged by the sender thread),
+    False if it was skipped or could not be queued.
     """
-    import os, json, smtplib, ssl
+    import os, json
     from email.message import EmailMessage
 
     try:
@@ -166,17 +279,7 @@ def email_event(ok: bool, bot_id: str, event: str, payload: Any, logfile: str =
             log.info("EMAIL_SKIPPED: dedupe %s %s", bot_id, event)
             return False
 
-        ctx = ssl.create_default_context()
-        with smtplib.SMTP(host, port, timeout=25) as s:
-            s.ehlo()
-            if port in (587, 25):
-                s.starttls(context=ctx)
-                s.ehlo()
-            s.login(user, pwd)
-            s.send_message(msg)
-
-        log.info("EMAIL_SENT to=%s subj=%s", to_addr, subj)
-        return True
+        return _mail_enqueue(host, port, user, pwd, msg)
 
     except Exception as e:
         log.exception("EMAIL_FAILED: %r", e)
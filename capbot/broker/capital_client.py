@@ -1,10 +1,16 @@
 import json
 import os
+import random
+import socket
+import sys
 import time
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
 
 class CapitalConfigError(RuntimeError):
@@ -36,6 +42,21 @@ def _sleep_backoff(i: int, cap: int = 30) -> None:
     time.sleep(min(cap, 2 ** max(0, int(i))))
 
 
+def to_number(val) -> float:
+    """float(val); broker strings with thousands separators ("1,234.56") take the slow path."""
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        if isinstance(val, str):
+            return float(val.replace(",", ""))
+        raise
+
+
+def poll_delay(attempt: int, base: float = 0.1, cap: float = 2.0) -> float:
+    """Delay before poll number `attempt` (0-based): base * 2**attempt capped at cap, +-20% jitter."""
+    return min(cap, base * (2 ** max(0, int(attempt)))) * random.uniform(0.8, 1.2)
+
+
 def _has_open_position_for_epic(positions_json, epic: str) -> bool:
     try:
         if not positions_json:
@@ -56,6 +77,38 @@ def _has_open_position_for_epic(positions_json, epic: str) -> bool:
         return False
 
 
+_SO_BUSY_POLL = getattr(socket, "SO_BUSY_POLL", 46 if sys.platform.startswith("linux") else None)
+
+
+def _socket_options() -> list:
+    """
+    Options for broker sockets: urllib3's defaults (TCP_NODELAY) plus SO_KEEPALIVE.
+    CAPITAL_BUSY_POLL_US=<usec> additionally turns on SO_BUSY_POLL (Linux; busy-waits
+    the NIC queue on reads, trading CPU for wakeup latency). It is only used if this
+    process may set it, so a missing CAP_NET_ADMIN cannot break connects.
+    """
+    opts = list(HTTPConnection.default_socket_options)
+    opts.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    try:
+        busy_us = int(os.environ.get("CAPITAL_BUSY_POLL_US", "0") or 0)
+    except ValueError:
+        busy_us = 0
+    if busy_us > 0 and _SO_BUSY_POLL is not None:
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+                probe.setsockopt(socket.SOL_SOCKET, _SO_BUSY_POLL, busy_us)
+            opts.append((socket.SOL_SOCKET, _SO_BUSY_POLL, busy_us))
+        except OSError:
+            pass
+    return opts
+
+
+class _CapitalAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", _socket_options())
+        super().init_poolmanager(*args, **kwargs)
+
+
 @dataclass
 class Session:
     base: str
@@ -80,7 +133,18 @@ class CapitalClient:
     def __init__(self, timeout: int = 30):
         self.timeout = timeout
         self.s: Optional[Session] = None
+        self.current_account_id: Optional[str] = None
         self.http = requests.Session()
+        # One keep-alive pool per client. urllib3 only retries failed *connects*
+        # here (nothing was sent yet); status/read errors stay with request().
+        adapter = _CapitalAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, connect=2, read=0, redirect=0, status=0, backoff_factor=0.2),
+        )
+        self.http.mount("https://", adapter)
+        self.http.headers["Connection"] = "keep-alive"
+        self._last_io = 0.0  # monotonic time of the last completed broker response
 
     def login(self, retries: int = 8, forever: bool = True) -> Session:
         """Login with retry/backoff.
@@ -124,6 +188,11 @@ class CapitalClient:
                         raise RuntimeError("Login OK but missing CST/X-SECURITY-TOKEN headers")
 
                     self.s = Session(base=BASE, cst=cst, xst=xst)
+                    try:
+                        acc = (r.json() or {}).get("currentAccountId")
+                    except ValueError:
+                        acc = None
+                    self.current_account_id = str(acc) if acc else None
 
                     try:
                         self.ensure_account(os.environ.get("CAPITAL_ACCOUNT_ID"))
@@ -200,6 +269,7 @@ class CapitalClient:
                     time.sleep(min(30, 2**i))
                     continue
                 r.raise_for_status()
+                self._last_io = time.monotonic()
                 return r
             except requests.exceptions.HTTPError as e:
                 last_err = e
@@ -219,21 +289,41 @@ class CapitalClient:
     def select_account(self, account_id: str) -> bool:
         try:
             r = self.request("PUT", "/api/v1/session", json_body={"accountId": str(account_id)}, retries=3)
-            return r.status_code in (200, 204)
+            ok = r.status_code in (200, 204)
+            if ok:
+                self.current_account_id = str(account_id)
+            return ok
         except Exception:
             return False
 
     def ensure_account(self, account_id: Optional[str]) -> None:
         if not account_id:
             return
+        if self.current_account_id is not None and self.current_account_id == str(account_id):
+            return  # known from login / last switch: no GET /session needed
         try:
             sess = self.get_session()
             cur = sess.get("currentAccountId") or sess.get("accountId")
+            if cur:
+                self.current_account_id = str(cur)
             if str(cur) != str(account_id):
                 self.select_account(str(account_id))
         except Exception:
             return
 
+    def ping(self) -> bool:
+        """GET /api/v1/ping: keeps the session alive (Capital.com expires it after ~10 min idle)."""
+        try:
+            self.request("GET", "/api/v1/ping", retries=2)
+            return True
+        except Exception:
+            return False
+
+    def prewarm(self, max_idle: float = 20.0) -> None:
+        """Before a latency-critical call: ping if the pooled connection may have gone cold."""
+        if time.monotonic() - self._last_io > max_idle:
+            self.ping()
+
     # market / trading
     def get_prices(self, epic: str, resolution: str, max_points: int) -> Dict[str, Any]:
         r = self.request("GET", f"/api/v1/prices/{epic}", params={"resolution": resolution, "max": max_points})
@@ -264,7 +354,7 @@ class CapitalClient:
                 pos = (item or {}).get("position") or {}
                 upl = pos.get("upl")
                 if upl is not None:
-                    return float(upl)
+                    return to_number(upl)
         except Exception:
             pass
         return None
@@ -360,6 +450,7 @@ class CapitalClient:
     def confirm(self, deal_reference: str, timeout_sec: int = 30) -> Optional[Dict[str, Any]]:
         t0 = time.time()
         last = None
+        attempt = 0
         while time.time() - t0 < timeout_sec:
             try:
                 r = self.request("GET", f"/api/v1/confirms/{deal_reference}", retries=3)
@@ -369,7 +460,9 @@ class CapitalClient:
                     return last
             except Exception:
                 pass
-            time.sleep(1)
+            # most confirms land within a few hundred ms; back off for the long tail
+            time.sleep(poll_delay(attempt))
+            attempt += 1
         return last
 
 def is_deal_open(positions_json: Dict[str, Any], deal_id: str) -> bool:
@@ -1,12 +1,31 @@
+import numpy as np
 import pandas as pd
 import pytz
 
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+def _rolling_mean(s: pd.Series, period: int) -> pd.Series:
+    """s.rolling(period).mean(), via bottleneck when installed."""
+    # bottleneck rejects a window longer than the input
+    if bn is None or len(s) < period:
+        return s.rolling(period).mean()
+    a = s.to_numpy(dtype="float64", na_value=float("nan"))
+    return pd.Series(bn.move_mean(a, period, min_count=period), index=s.index)
+
 def rsi(series: pd.Series, period: int) -> pd.Series:
     delta = series.diff()
-    up = delta.clip(lower=0).rolling(period).mean()
-    dn = (-delta).clip(lower=0).rolling(period).mean()
-    rs = up / dn.replace(0, pd.NA)
-    return 100 - (100 / (1 + rs))
+    up = _rolling_mean(delta.clip(lower=0), period)
+    dn = _rolling_mean((-delta).clip(lower=0), period)
+    # rs is NaN where dn == 0; a where-guarded divide keeps it float64
+    # (replace(0, pd.NA) turned the whole result into object dtype)
+    u = up.to_numpy(dtype="float64", na_value=np.nan)
+    d = dn.to_numpy(dtype="float64", na_value=np.nan)
+    rs = np.full(d.shape, np.nan)
+    np.divide(u, d, out=rs, where=d != 0)
+    return pd.Series(100 - (100 / (1 + rs)), index=series.index)
 
 def atr(df: pd.DataFrame, period: int) -> pd.Series:
     prev_close = df["close"].shift(1)
@@ -16,7 +35,7 @@ def atr(df: pd.DataFrame, period: int) -> pd.Series:
          (df["low"] - prev_close).abs()],
         axis=1,
     ).max(axis=1)
-    return tr.rolling(period).mean()
+    return _rolling_mean(tr, period)
 
 def vwap_intraday(df: pd.DataFrame, tz_name: str) -> pd.Series:
     """
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
+import numpy as np
 import pandas as pd
 
 try:
@@ -50,6 +53,54 @@ def _to_utc_ts(x: Any) -> pd.Timestamp:
         return pd.NaT
 
 
+_EPOCH = datetime(1970, 1, 1)
+_NS = 1_000_000_000
+_FOREVER = 2 ** 63 - 1
+
+# tz_name -> (lo_ns, hi_ns, offset_ns): the UTC span of the last offset looked up
+_OFFSET_SEGMENT: Dict[str, Tuple[int, int, int]] = {}
+
+
+@lru_cache(maxsize=16)
+def _tz_transition_arrays(tz_name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(transition instants, offset from each instant on), both int64 epoch ns, from the pytz table."""
+    import pytz  # type: ignore
+
+    tz = pytz.timezone(tz_name)
+    times = getattr(tz, "_utc_transition_times", None)
+    if not times:
+        # fixed-offset zone (UTC, Etc/GMT+n): one segment covering everything
+        starts = [-_FOREVER]
+        offsets = [int(tz.utcoffset(_EPOCH).total_seconds()) * _NS]
+    else:
+        starts = [int((t - _EPOCH).total_seconds()) * _NS for t in times]
+        starts[0] = -_FOREVER
+        offsets = [int(info[0].total_seconds()) * _NS for info in tz._transition_info]
+    return np.asarray(starts, dtype=np.int64), np.asarray(offsets, dtype=np.int64)
+
+
+def utc_offset_ns(tz_name: str, utc_ns: int) -> int:
+    """
+    UTC offset of tz_name at the instant utc_ns (epoch ns), in ns.
+    The DST segment of the previous lookup is kept, so consecutive bars cost
+    two int comparisons instead of a tz conversion.
+    """
+    seg = _OFFSET_SEGMENT.get(tz_name)
+    if seg is not None and seg[0] <= utc_ns < seg[1]:
+        return seg[2]
+    starts, offsets = _tz_transition_arrays(tz_name)
+    k = int(starts.searchsorted(utc_ns, side="right")) - 1
+    hi = int(starts[k + 1]) if k + 1 < starts.size else _FOREVER
+    _OFFSET_SEGMENT[tz_name] = (int(starts[k]), hi, int(offsets[k]))
+    return int(offsets[k])
+
+
+def utc_offsets_ns(tz_name: str, utc_ns: np.ndarray) -> np.ndarray:
+    """utc_offset_ns() for an int64 array of epoch ns (one searchsorted, no tz conversion)."""
+    starts, offsets = _tz_transition_arrays(tz_name)
+    return offsets[np.searchsorted(starts, utc_ns, side="right") - 1]
+
+
 @dataclass(frozen=True)
 class RTH:
     tz_name: str
@@ -5,11 +5,25 @@ import os
 from pathlib import Path
 from typing import Any, Dict
 
+try:  # optional: faster JSON parsing
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads_json(raw: bytes) -> Any:
+    """json.loads via orjson when installed; also used for config and health_check."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity, which json.dumps writes but orjson rejects
+    return json.loads(raw)
+
 
 def _read_json(path: Path) -> Dict[str, Any]:
     try:
-        txt = path.read_text(encoding="utf-8")
-        obj = json.loads(txt)
+        obj = loads_json(path.read_bytes())
         return obj if isinstance(obj, dict) else {}
     except Exception:
         return {}
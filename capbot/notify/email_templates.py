@@ -48,6 +48,48 @@ EVENT_LABEL = {
     "ERROR": "ERROR",
 }
 
+# Epic -> display name
+_EPIC_NAMES = {
+    "DE40": "Germany 40", "GER40": "Germany 40", "GERMANY40": "Germany 40",
+    "GERMANY40CASH": "Germany 40",
+    "US500": "S&P 500", "SPX500": "S&P 500",
+    "META": "META", "NVDA": "NVDA",
+}
+
+# Templates are built once at import; render_email/subject only fill them in.
+_SUBJECT_TMPL = "{market} {tf} | {label} {ico}"
+
+_SUMMARY_TMPL = "<div style='margin-top:6px;font-size:13px;color:#6b7280;line-height:1.4;'>{}</div>"
+_FOOTER_TMPL = "<div style='margin-top:12px;font-size:12px;color:#6b7280;'>{}</div>"
+
+# Detail table row: _ROW_K + key + _ROW_V + value + _ROW_END
+_ROW_K = "<tr><td style='padding:8px 10px;color:#6b7280;white-space:nowrap;border-bottom:1px solid #eef0f6'>"
+_ROW_V = "</td><td style='padding:8px 10px;border-bottom:1px solid #eef0f6'>"
+_ROW_END = "</td></tr>"
+
+_HTML_TMPL = """<!doctype html>
+<html>
+  <body style="margin:0;padding:20px;background:#f6f7fb;font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,Arial,sans-serif;">
+    <div style="max-width:720px;margin:0 auto;">
+      <div style="background:#ffffff;border:1px solid #e6e8f0;border-radius:14px;overflow:hidden;box-shadow:0 6px 18px rgba(17,24,39,0.06);">
+        <div style="padding:18px 18px 10px 18px;border-bottom:1px solid #eef0f6;">
+          <div style="font-size:18px;font-weight:700;color:#111827;line-height:1.2;">{headline}</div>
+          {summary}
+        </div>
+
+        <div style="padding:0 18px 16px 18px;">
+          <table style="width:100%;border-collapse:collapse;font-size:13px;color:#111827;margin-top:10px;">
+            {table}
+          </table>
+
+          {footer}
+        </div>
+      </div>
+    </div>
+  </body>
+</html>
+"""
+
 
 def _fmt(v: Any, nd: int = 2) -> str:
     try:
@@ -93,12 +135,6 @@ def _market_and_tf(payload: Dict[str, Any], meta: Dict[str, Any]) -> Tuple[str,
     market = str(raw_market).replace("_", " ").strip()
 
     # Normalize epic -> display name
-    _EPIC_NAMES = {
-        "DE40": "Germany 40", "GER40": "Germany 40", "GERMANY40": "Germany 40",
-        "GERMANY40CASH": "Germany 40",
-        "US500": "S&P 500", "SPX500": "S&P 500",
-        "META": "META", "NVDA": "NVDA",
-    }
     upper = market.upper().replace(" ", "")
     if upper in _EPIC_NAMES:
         market = _EPIC_NAMES[upper]
@@ -148,7 +184,7 @@ def subject(event: str, payload: Dict[str, Any], meta: Dict[str, Any]) -> str:
         elif ok is False:
             ico = "❌"
 
-    return f"{market} {tf} | {label} {ico}"
+    return _SUBJECT_TMPL.format(market=market, tf=tf, label=label, ico=ico)
 
 
 def render_email(event: str, bot_id: str, payload: Dict[str, Any], meta: Dict[str, Any]) -> Tuple[str, str]:
@@ -241,36 +277,14 @@ def render_email(event: str, bot_id: str, payload: Dict[str, Any], meta: Dict[st
     text_body = "\n".join(text_lines).strip() + "\n"
 
     # HTML
-    def tr(k: str, v: Any) -> str:
-        return (
-            "<tr>"
-            f"<td style='padding:8px 10px;color:#6b7280;white-space:nowrap;border-bottom:1px solid #eef0f6'>{escape(str(k))}</td>"
-            f"<td style='padding:8px 10px;border-bottom:1px solid #eef0f6'>{escape(str(v))}</td>"
-            "</tr>"
-        )
-
-    table_html = "".join(tr(k, v) for k, v in rows) if rows else ""
-
-    html = f"""<!doctype html>
-<html>
-  <body style="margin:0;padding:20px;background:#f6f7fb;font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,Arial,sans-serif;">
-    <div style="max-width:720px;margin:0 auto;">
-      <div style="background:#ffffff;border:1px solid #e6e8f0;border-radius:14px;overflow:hidden;box-shadow:0 6px 18px rgba(17,24,39,0.06);">
-        <div style="padding:18px 18px 10px 18px;border-bottom:1px solid #eef0f6;">
-          <div style="font-size:18px;font-weight:700;color:#111827;line-height:1.2;">{escape(headline)}</div>
-          {"<div style='margin-top:6px;font-size:13px;color:#6b7280;line-height:1.4;'>" + escape(summary) + "</div>" if summary else ""}
-        </div>
-
-        <div style="padding:0 18px 16px 18px;">
-          <table style="width:100%;border-collapse:collapse;font-size:13px;color:#111827;margin-top:10px;">
-            {table_html}
-          </table>
+    table_html = "".join(
+        _ROW_K + escape(str(k)) + _ROW_V + escape(str(v)) + _ROW_END for k, v in rows
+    )
 
-          {"<div style='margin-top:12px;font-size:12px;color:#6b7280;'>" + escape(footer) + "</div>" if footer else ""}
-        </div>
-      </div>
-    </div>
-  </body>
-</html>
-"""
+    html = _HTML_TMPL.format(
+        headline=escape(headline),
+        summary=_SUMMARY_TMPL.format(escape(summary)) if summary else "",
+        table=table_html,
+        footer=_FOOTER_TMPL.format(escape(footer)) if footer else "",
+    )
     return text_body, html
@@ -0,0 +1,442 @@
+"""
+Rolling-window helpers shared by strategy enrich() implementations.
+
+All helpers take a Series/array and return a float64 ndarray aligned with the
+input, with NaN until the window is full (pandas `rolling(n).x()` semantics).
+Uses bottleneck / numba when installed, pandas/numpy otherwise.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import bottleneck as bn
+    _HAVE_BN = True
+except ImportError:
+    _HAVE_BN = False
+
+try:
+    from numba import njit
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+def _f64(x: Any) -> np.ndarray:
+    return np.asarray(x, dtype=np.float64)
+
+
+@njit(cache=True)
+def _move_sum_nb(a, n):
+    # Running sum: add the new bar, drop the one leaving the window.
+    # n_nan keeps pandas semantics (any NaN in the window -> NaN).
+    out = np.full(a.size, np.nan)
+    s = 0.0
+    n_nan = 0
+    for i in range(a.size):
+        x = a[i]
+        if np.isnan(x):
+            n_nan += 1
+        else:
+            s += x
+        if i >= n:
+            x = a[i - n]
+            if np.isnan(x):
+                n_nan -= 1
+            else:
+                s -= x
+        if i >= n - 1 and n_nan == 0:
+            out[i] = s
+    return out
+
+
+def _move_sum_np(a: np.ndarray, n: int) -> np.ndarray:
+    # Window sums as a cumsum difference; a parallel cumsum of the NaN flags
+    # marks windows that contain a NaN.
+    out = np.full(a.size, np.nan)
+    if a.size < n:
+        return out
+    nan = np.isnan(a)
+    cs = np.concatenate(([0.0], np.cumsum(np.where(nan, 0.0, a))))
+    cn = np.concatenate(([0], np.cumsum(nan)))
+    w = cs[n:] - cs[:-n]
+    w[(cn[n:] - cn[:-n]) > 0] = np.nan
+    out[n - 1:] = w
+    return out
+
+
+# bottleneck raises when the window is longer than the input, so short
+# inputs take the fallbacks below (all NaN, like pandas).
+def move_mean(x: Any, n: int) -> np.ndarray:
+    a = _f64(x)
+    if _HAVE_BN and a.size >= n:
+        return bn.move_mean(a, n, min_count=n)
+    if _HAVE_NUMBA:
+        return _move_sum_nb(a, n) / n
+    return _move_sum_np(a, n) / n
+
+
+def move_sum(x: Any, n: int) -> np.ndarray:
+    a = _f64(x)
+    if _HAVE_BN and a.size >= n:
+        return bn.move_sum(a, n, min_count=n)
+    if _HAVE_NUMBA:
+        return _move_sum_nb(a, n)
+    return _move_sum_np(a, n)
+
+
+def move_std(x: Any, n: int) -> np.ndarray:
+    """Sample std (ddof=1), same as pandas rolling().std()."""
+    a = _f64(x)
+    if _HAVE_BN and a.size >= n:
+        return bn.move_std(a, n, min_count=n, ddof=1)
+    return pd.Series(a).rolling(n, min_periods=n).std().to_numpy()
+
+
+def move_max(x: Any, n: int) -> np.ndarray:
+    a = _f64(x)
+    if _HAVE_BN and a.size >= n:
+        return bn.move_max(a, n, min_count=n)
+    return pd.Series(a).rolling(n, min_periods=n).max().to_numpy()
+
+
+def shift1(x: Any) -> np.ndarray:
+    """Shift forward by one bar (NaN first), like Series.shift(1)."""
+    a = _f64(x)
+    out = np.empty_like(a)
+    out[:1] = np.nan
+    out[1:] = a[:-1]
+    return out
+
+
+def safe_div(num: Any, den: Any) -> np.ndarray:
+    """num / den as float64, NaN where den == 0 (like den.replace(0, np.nan))."""
+    a = _f64(num)
+    b = _f64(den)
+    out = np.full(np.broadcast(a, b).shape, np.nan)
+    return np.divide(a, b, out=out, where=b != 0.0)
+
+
+def all_finite(df: Union[pd.DataFrame, Mapping[str, Any]], cols: Sequence[str]) -> np.ndarray:
+    """Per-row bool: every column in cols is finite (not NaN/inf)."""
+    ok = None
+    for c in cols:
+        v = df[c]
+        if isinstance(v, pd.Series):
+            v = v.to_numpy(dtype=np.float64, na_value=np.nan)
+        fin = np.isfinite(v)
+        ok = fin if ok is None else ok & fin
+    return ok
+
+
+def with_columns(df: pd.DataFrame, cols: Dict[str, Any]) -> pd.DataFrame:
+    """
+    df plus new columns, built with one concat instead of a column insert
+    per indicator. df itself is not modified. Existing names are overwritten
+    (assign) so re-enriching an enriched frame does not duplicate columns.
+    """
+    if df.columns.intersection(list(cols)).size:
+        return df.assign(**cols)
+    return pd.concat([df, pd.DataFrame(cols, index=df.index)], axis=1)
+
+
+def true_range(df: pd.DataFrame) -> np.ndarray:
+    """
+    max(high-low, |high-prev_close|, |low-prev_close|) as one ndarray.
+    fmax skips the NaN prev_close on the first bar, like pandas max(axis=1).
+    """
+    h = _f64(df["high"])
+    l = _f64(df["low"])
+    pc = shift1(df["close"])
+    return np.fmax(h - l, np.fmax(np.abs(h - pc), np.abs(l - pc)))
+
+
+def rsi_sma(close: Any, n: int = 14) -> np.ndarray:
+    """RSI from simple (not Wilder) averages of up/down moves; NaN where the down average is 0."""
+    c = _f64(close)
+    delta = c - shift1(c)
+    up = np.maximum(delta, 0.0)
+    down = move_mean(up - delta, n)
+    return 100.0 - 100.0 / (1.0 + safe_div(move_mean(up, n), down))
+
+
+def atr_sma(df: pd.DataFrame, n: int = 14) -> np.ndarray:
+    """Simple average of true_range() over n bars."""
+    return move_mean(true_range(df), n)
+
+
+@njit(cache=True)
+def _ewm_mean_nb(a, alpha):
+    # Same recurrence as pandas' ewma with adjust=False, ignore_na=False:
+    # a NaN bar repeats the last value but still decays the old weight, so
+    # the next observation weighs in as if the gap bars had been seen.
+    out = np.full(a.size, np.nan)
+    decay = 1.0 - alpha
+    w = np.nan
+    old_wt = 1.0
+    for i in range(a.size):
+        x = a[i]
+        if not np.isnan(w):
+            old_wt *= decay
+            if not np.isnan(x):
+                if w != x:
+                    w = (old_wt * w + alpha * x) / (old_wt + alpha)
+                old_wt = 1.0
+        elif not np.isnan(x):
+            w = x
+        out[i] = w
+    return out
+
+
+def ewm_mean(x: Any, alpha: float) -> np.ndarray:
+    """Series.ewm(alpha=alpha, adjust=False).mean() as a float64 ndarray."""
+    a = _f64(x)
+    if _HAVE_NUMBA:
+        return _ewm_mean_nb(a, float(alpha))
+    return pd.Series(a).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+@njit(cache=True)
+def _segment_cumsum_nb(a, key):
+    # Kahan-compensated like pandas' group_cumsum, so results match bit for bit.
+    out = np.empty(a.size)
+    s = 0.0
+    comp = 0.0
+    for i in range(a.size):
+        if i == 0 or key[i] != key[i - 1]:
+            s = 0.0
+            comp = 0.0
+        x = a[i]
+        if np.isnan(x):
+            out[i] = np.nan
+        else:
+            y = x - comp
+            t = s + y
+            comp = t - s - y
+            s = t
+            out[i] = s
+    return out
+
+
+def segment_cumsum(x: Any, key: np.ndarray) -> np.ndarray:
+    """
+    Running sum that restarts whenever key changes, i.e. groupby(key).cumsum()
+    for a key that is already sorted (each group one contiguous run).
+    NaN inputs give NaN and are skipped by the running sum.
+    """
+    a = _f64(x)
+    if _HAVE_NUMBA:
+        return _segment_cumsum_nb(a, key)
+    nan = np.isnan(a)
+    cs = np.cumsum(np.where(nan, 0.0, a))
+    starts = np.flatnonzero(key[1:] != key[:-1]) + 1
+    seg = np.zeros(a.size, dtype=np.intp)
+    seg[starts] = 1
+    base = np.concatenate(([0.0], cs[starts - 1]))[np.cumsum(seg)]
+    out = cs - base
+    out[nan] = np.nan
+    return out
+
+
+@njit(cache=True)
+def _prev3_counts_nb(close, open_):
+    n = close.size
+    bear = np.full(n, np.nan)
+    bull = np.full(n, np.nan)
+    s_br = 0
+    s_bu = 0
+    for i in range(n):
+        if i >= 1:
+            s_br += int(close[i - 1] < open_[i - 1])
+            s_bu += int(close[i - 1] > open_[i - 1])
+        if i >= 4:
+            s_br -= int(close[i - 4] < open_[i - 4])
+            s_bu -= int(close[i - 4] > open_[i - 4])
+        if i >= 3:
+            bear[i] = s_br
+            bull[i] = s_bu
+    return bear, bull
+
+
+def _prev3_sum(flag: np.ndarray) -> np.ndarray:
+    # Count over the 3 bars before each bar as a cumsum difference on 1-byte flags.
+    cs = np.cumsum(flag, dtype=np.int32)
+    out = np.full(flag.size, np.nan)
+    if flag.size > 3:
+        out[3] = cs[2]
+        out[4:] = cs[3:-1] - cs[:-4]
+    return out
+
+
+def prev3_counts(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (bear_prev3, bull_prev3): bearish/bullish candles among the 3 bars before
+    each bar, i.e. (close < open).shift(1).rolling(3).sum() and the bull twin.
+    """
+    c = _f64(df["close"])
+    o = _f64(df["open"])
+    if _HAVE_NUMBA:
+        return _prev3_counts_nb(c, o)
+    return _prev3_sum((c < o).view(np.int8)), _prev3_sum((c > o).view(np.int8))
+
+
+@njit(cache=True)
+def _sma_bar_indicators_nb(o, h, l, c, v, vol_n, rsi_n, atr_n):
+    n = c.size
+    nan = np.nan
+    rng = h - l
+    body = np.full(n, nan)
+    vol_ma = np.full(n, nan)
+    vol_rel = np.full(n, nan)
+    rsi = np.full(n, nan)
+    atr = np.full(n, nan)
+    bear = np.full(n, nan)
+    bull = np.full(n, nan)
+    # Values still inside the RSI / ATR windows (ring buffers)
+    d_ring = np.empty(rsi_n)
+    tr_ring = np.empty(atr_n)
+
+    # Running window sums; NaN and non-zero counts keep pandas semantics
+    # (NaN anywhere in the window -> NaN, all-zero window -> exactly 0).
+    s_v = 0.0
+    nan_v = 0
+    nz_v = 0
+    s_up = 0.0
+    s_dn = 0.0
+    nan_ud = 0
+    nz_up = 0
+    nz_dn = 0
+    s_tr = 0.0
+    nan_tr = 0
+    s_br = 0
+    s_bu = 0
+
+    for i in range(n):
+        if rng[i] != 0.0:
+            body[i] = abs(c[i] - o[i]) / rng[i]
+
+        # vol_ma / vol_rel
+        x = v[i]
+        if np.isnan(x):
+            nan_v += 1
+        else:
+            s_v += x
+            nz_v += x != 0.0
+        if i >= vol_n:
+            x = v[i - vol_n]
+            if np.isnan(x):
+                nan_v -= 1
+            else:
+                s_v -= x
+                nz_v -= x != 0.0
+        if i >= vol_n - 1 and nan_v == 0:
+            m = s_v / vol_n if nz_v else 0.0
+            vol_ma[i] = m
+            if m != 0.0:
+                vol_rel[i] = v[i] / m
+
+        # RSI (SMA of up/down moves): up = max(d, 0), down = max(-d, 0),
+        # split inline from the close-to-close delta d
+        if i >= rsi_n:
+            x = d_ring[i % rsi_n]
+            if np.isnan(x):
+                nan_ud -= 1
+            elif x > 0.0:
+                s_up -= x
+                nz_up -= 1
+            elif x < 0.0:
+                s_dn += x
+                nz_dn -= 1
+        x = c[i] - c[i - 1] if i >= 1 else nan
+        d_ring[i % rsi_n] = x
+        if np.isnan(x):
+            nan_ud += 1
+        elif x > 0.0:
+            s_up += x
+            nz_up += 1
+        elif x < 0.0:
+            s_dn -= x
+            nz_dn += 1
+        if i >= rsi_n - 1 and nan_ud == 0 and nz_dn:
+            u = s_up / rsi_n if nz_up else 0.0
+            rsi[i] = 100.0 - 100.0 / (1.0 + u / (s_dn / rsi_n))
+
+        # ATR (SMA of true range)
+        if i >= atr_n:
+            t = tr_ring[i % atr_n]
+            if np.isnan(t):
+                nan_tr -= 1
+            else:
+                s_tr -= t
+        t = rng[i]
+        if i >= 1:
+            pc = c[i - 1]
+            t = np.fmax(t, np.fmax(abs(h[i] - pc), abs(l[i] - pc)))
+        tr_ring[i % atr_n] = t
+        if np.isnan(t):
+            nan_tr += 1
+        else:
+            s_tr += t
+        if i >= atr_n - 1 and nan_tr == 0:
+            atr[i] = s_tr / atr_n
+
+        # bear/bull among the 3 bars before i
+        if i >= 1:
+            s_br += c[i - 1] < o[i - 1]
+            s_bu += c[i - 1] > o[i - 1]
+        if i >= 4:
+            s_br -= c[i - 4] < o[i - 4]
+            s_bu -= c[i - 4] > o[i - 4]
+        if i >= 3:
+            bear[i] = s_br
+            bull[i] = s_bu
+
+    return rng, body, vol_ma, vol_rel, bear, bull, rsi, atr
+
+
+def sma_bar_indicators(
+    df: pd.DataFrame, vol_n: int = 20, rsi_n: int = 14, atr_n: int = 14
+) -> Tuple[np.ndarray, ...]:
+    """
+    (range, body_ratio, vol_ma, vol_rel, bear_prev3, bull_prev3, rsi, atr) for
+    the SMA-based 5m strategies, in one pass over the bars when numba is
+    available. RSI/ATR are plain SMAs (not Wilder); zero denominators give NaN.
+    """
+    o = _f64(df["open"])
+    h = _f64(df["high"])
+    l = _f64(df["low"])
+    c = _f64(df["close"])
+    v = _f64(df["volume"])
+    if _HAVE_NUMBA:
+        return _sma_bar_indicators_nb(o, h, l, c, v, vol_n, rsi_n, atr_n)
+
+    rng = h - l
+    body = safe_div(np.abs(c - o), rng)
+    vol_ma = move_mean(v, vol_n)
+    vol_rel = safe_div(v, vol_ma)
+    bear, bull = prev3_counts(df)
+    return rng, body, vol_ma, vol_rel, bear, bull, rsi_sma(c, rsi_n), atr_sma(df, atr_n)
+
+
+def warmup() -> None:
+    """
+    Compile (or load from numba's on-disk cache) every kernel on a tiny input.
+    run_bot calls this once at startup so the first live enrich does not pay
+    the JIT cost. No-op without numba.
+    """
+    if not _HAVE_NUMBA:
+        return
+    x = np.linspace(1.0, 2.0, 8)
+    _move_sum_nb(x, 3)
+    _ewm_mean_nb(x, 0.5)
+    _segment_cumsum_nb(x, np.arange(8) // 3)
+    _prev3_counts_nb(x, x[::-1].copy())
+    _sma_bar_indicators_nb(x, x + 1.0, x - 1.0, x, x, 3, 3, 3)
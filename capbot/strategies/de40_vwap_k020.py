@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional
 
 import numpy as np
 import pandas as pd
 
+from capbot.domain.schedule import utc_offset_ns
+from capbot.strategies._kernels import all_finite, move_mean, prev3_counts, safe_div, with_columns
 from capbot.strategies.vwap_pullback_rsi import (
     Signal,
     rsi_wilder,
@@ -12,6 +16,11 @@ from capbot.strategies.vwap_pullback_rsi import (
     vwap_intraday_reset_berlin,
 )
 
+_NS_PER_MIN = 60_000_000_000
+
+# Indicators that must be finite on the signal bar
+_NEED_COLS = ("body_ratio", "vol_rel", "rsi14", "atr14", "vwap", "bear_prev3", "bull_prev3")
+
 
 def _get_ts_utc(df: pd.DataFrame, i: int) -> pd.Timestamp:
     """Return tz-aware UTC timestamp for bar at index i."""
@@ -30,43 +39,102 @@ def _get_ts_utc(df: pd.DataFrame, i: int) -> pd.Timestamp:
     raise ValueError("Requires df.index DatetimeIndex or 'time' column")
 
 
+@lru_cache(maxsize=8)
+def _parse_hhmm(s: str) -> int:
+    """'HH:MM' -> minutes after midnight."""
+    h, m = s.split(":")
+    return int(h) * 60 + int(m)
+
+
+@dataclass(frozen=True)
+class _DE40Cfg:
+    """Signal parameters parsed once from the params dict."""
+    __slots__ = (
+        "VWAP_TZ", "BODY_MIN", "VOL_REL_MIN", "RSI_LONG_MAX", "RSI_SHORT_MIN",
+        "BEAR_PREV3_LONG", "BULL_PREV3_SHORT", "VWAP_DISTANCE_K",
+        "DISABLE_THURSDAY_UTC", "RTH_START_MIN", "RTH_END_MIN", "NO_TRADE_HOURS",
+    )
+
+    VWAP_TZ: str
+    BODY_MIN: float
+    VOL_REL_MIN: float
+    RSI_LONG_MAX: float
+    RSI_SHORT_MIN: float
+    BEAR_PREV3_LONG: int
+    BULL_PREV3_SHORT: int
+    VWAP_DISTANCE_K: float
+    DISABLE_THURSDAY_UTC: bool
+    RTH_START_MIN: int
+    RTH_END_MIN: int
+    NO_TRADE_HOURS: FrozenSet[int]
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "_DE40Cfg":
+        return cls(
+            VWAP_TZ=str(params.get("VWAP_TZ", "Europe/Berlin")),
+            BODY_MIN=float(params.get("BODY_MIN", 0.70)),
+            VOL_REL_MIN=float(params.get("VOL_REL_MIN", 0.70)),
+            RSI_LONG_MAX=float(params.get("RSI_LONG_MAX", 75)),
+            RSI_SHORT_MIN=float(params.get("RSI_SHORT_MIN", 40)),
+            BEAR_PREV3_LONG=int(params.get("BEAR_PREV3_LONG", 2)),
+            BULL_PREV3_SHORT=int(params.get("BULL_PREV3_SHORT", 2)),
+            VWAP_DISTANCE_K=float(params.get("VWAP_DISTANCE_K", 0.20)),
+            DISABLE_THURSDAY_UTC=bool(params.get("DISABLE_THURSDAY_UTC", True)),
+            RTH_START_MIN=_parse_hhmm(str(params.get("RTH_START", "09:30"))),
+            RTH_END_MIN=_parse_hhmm(str(params.get("RTH_END", "17:30"))),
+            NO_TRADE_HOURS=frozenset(params.get("NO_TRADE_HOURS_BERLIN", ())),
+        )
+
+
 class DE40VWAPK020:
     """
     DE40/GER40 5m strategy: Daily VWAP + VWAP distance filter (k=0.20).
     Signal on closed bar; entry on next bar open (handled by engine).
     """
 
-    def enrich(self, df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
-        out = df.copy()
+    def __init__(self) -> None:
+        self._cfg_params: Optional[Dict[str, Any]] = None
+        self._cfg_cache: Optional[_DE40Cfg] = None
+
+    def _cfg(self, params: Dict[str, Any]) -> _DE40Cfg:
+        # Engine hands us the same params dict every bar and a new dict on
+        # config reload, so identity is enough to know when to re-parse.
+        if params is not self._cfg_params or self._cfg_cache is None:
+            self._cfg_cache = _DE40Cfg.from_params(params)
+            self._cfg_params = params
+        return self._cfg_cache
 
+    def enrich(self, df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
         vol_window = int(params.get("VOL_WINDOW", 20))
         rsi_len = int(params.get("RSI_LEN", params.get("RSI_PERIOD", 14)))
         atr_len = int(params.get("ATR_LEN", params.get("ATR_PERIOD", 14)))
         tz = str(params.get("VWAP_TZ", "Europe/Berlin"))
 
+        # New columns only; attached to df in one concat at the end
+        out: Dict[str, Any] = {}
+
         # Body ratio
-        rng = (out["high"] - out["low"]).replace(0, np.nan)
-        out["body_ratio"] = (out["close"] - out["open"]).abs() / rng
-        out["body_ratio"] = out["body_ratio"].replace([np.inf, -np.inf], np.nan).fillna(0.0)
+        body = safe_div((df["close"] - df["open"]).abs(), df["high"] - df["low"])
+        body[~np.isfinite(body)] = 0.0
+        out["body_ratio"] = body
 
         # Volume relative to SMA
-        out["vol_sma"] = out["volume"].rolling(vol_window).mean()
-        out["vol_rel"] = out["volume"] / out["vol_sma"].replace(0, np.nan)
+        out["vol_sma"] = move_mean(df["volume"], vol_window)
+        out["vol_rel"] = safe_div(df["volume"], out["vol_sma"])
 
         # Prev 3 bars: count of bears/bulls (shifted by 1)
-        is_bear = (out["close"] < out["open"]).astype(int)
-        is_bull = (out["close"] > out["open"]).astype(int)
-        out["bear_prev3"] = is_bear.shift(1).rolling(3).sum()
-        out["bull_prev3"] = is_bull.shift(1).rolling(3).sum()
+        out["bear_prev3"], out["bull_prev3"] = prev3_counts(df)
 
         # RSI / ATR (Wilder smoothing)
-        out["rsi14"] = rsi_wilder(out["close"], rsi_len)
-        out["atr14"] = atr_wilder(out, atr_len)
+        out["rsi14"] = rsi_wilder(df["close"], rsi_len).to_numpy()
+        out["atr14"] = atr_wilder(df, atr_len).to_numpy()
 
         # Intraday VWAP (resets at 00:00 local time)
-        out["vwap"] = vwap_intraday_reset_berlin(out, tz)
+        out["vwap"] = vwap_intraday_reset_berlin(df, tz).to_numpy()
+
+        out["_indicators_ready"] = all_finite(out, _NEED_COLS)
 
-        return out
+        return with_columns(df, out)
 
     def signal_on_bar_close(self, df: pd.DataFrame, params: Dict[str, Any]) -> Optional[Signal]:
         if df is None or len(df) < 50:
@@ -74,53 +142,39 @@ class DE40VWAPK020:
 
         # Use the last CLOSED bar (iloc[-2])
         i = -2
-        row = df.iloc[i]
 
-        tz = str(params.get("VWAP_TZ", "Europe/Berlin"))
+        cfg = self._cfg(params)
         ts_utc = _get_ts_utc(df, i)
         if ts_utc is None or pd.isna(ts_utc):
-            ts_utc = pd.Timestamp.utcnow().tz_localize("UTC")
-        ts_local = ts_utc.tz_convert(tz)
-
-        # Strategy parameters
-        BODY_MIN = float(params.get("BODY_MIN", 0.70))
-        VOL_REL_MIN = float(params.get("VOL_REL_MIN", 0.70))
-        RSI_LONG_MAX = float(params.get("RSI_LONG_MAX", 75))
-        RSI_SHORT_MIN = float(params.get("RSI_SHORT_MIN", 40))
-        BEAR_PREV3_LONG = int(params.get("BEAR_PREV3_LONG", 2))
-        BULL_PREV3_SHORT = int(params.get("BULL_PREV3_SHORT", 2))
-        VWAP_DISTANCE_K = float(params.get("VWAP_DISTANCE_K", 0.20))
+            ts_utc = pd.Timestamp.now(tz="UTC")
 
-        # Schedule gates (strategy-level, optional overrides)
-        disable_thursday_utc = bool(params.get("DISABLE_THURSDAY_UTC", True))
-        no_trade_hours = set(params.get("NO_TRADE_HOURS_BERLIN", []))
-        rth_start = str(params.get("RTH_START", "09:30"))
-        rth_end = str(params.get("RTH_END", "17:30"))
+        # Local minute of day from the cached UTC offset (no tz_convert per bar)
+        ns = ts_utc.value
+        t_min = (ns + utc_offset_ns(cfg.VWAP_TZ, ns)) // _NS_PER_MIN % 1440
 
-        sh, sm = map(int, rth_start.split(":"))
-        eh, em = map(int, rth_end.split(":"))
-        start_ok = (ts_local.hour > sh) or (ts_local.hour == sh and ts_local.minute >= sm)
-        end_ok = (ts_local.hour < eh) or (ts_local.hour == eh and ts_local.minute <= em)
-        in_rth = start_ok and end_ok
+        # Schedule gates (strategy-level, optional overrides)
+        in_rth = cfg.RTH_START_MIN <= t_min <= cfg.RTH_END_MIN
 
-        thu_ok = not (disable_thursday_utc and ts_utc.weekday() == 3)
-        nth_ok = (ts_local.hour not in no_trade_hours)
+        thu_ok = not (cfg.DISABLE_THURSDAY_UTC and ts_utc.weekday() == 3)
+        nth_ok = (t_min // 60 not in cfg.NO_TRADE_HOURS)
 
         if not thu_ok or not in_rth or not nth_ok:
             return None
 
         # Validate required columns
-        need_cols = ["body_ratio", "vol_rel", "rsi14", "atr14", "vwap", "bear_prev3", "bull_prev3"]
-        for c in need_cols:
-            if c not in df.columns:
-                return None
-            v = row.get(c)
-            if v is None or (isinstance(v, float) and (np.isnan(v) or np.isinf(v))):
-                return None
-
-        # Extract values
-        body_ratio = float(row["body_ratio"])
-        vol_rel = float(row["vol_rel"])
+        ready = df.get("_indicators_ready")
+        if ready is None or not ready.iat[i]:
+            return None
+
+        # Filter checks: body/volume reject most bars, so read just those cells first
+        body_ratio = float(df["body_ratio"].iat[i])
+        if body_ratio < cfg.BODY_MIN:
+            return None
+        vol_rel = float(df["vol_rel"].iat[i])
+        if vol_rel < cfg.VOL_REL_MIN:
+            return None
+
+        row = df.iloc[i]
         rsi = float(row["rsi14"])
         atr = float(row["atr14"])
         vwap = float(row["vwap"])
@@ -129,19 +183,14 @@ class DE40VWAPK020:
         bear_prev3 = float(row["bear_prev3"])
         bull_prev3 = float(row["bull_prev3"])
 
-        # Filter checks
-        if body_ratio < BODY_MIN:
-            return None
-        if vol_rel < VOL_REL_MIN:
-            return None
-        if abs(close - vwap) < (VWAP_DISTANCE_K * atr):
+        if abs(close - vwap) < (cfg.VWAP_DISTANCE_K * atr):
             return None
 
         # Signal logic
         # BUY: bullish candle, bear_prev3 >= threshold, RSI not overbought, close > VWAP
         # SELL: bearish candle, bull_prev3 >= threshold, RSI not oversold, close < VWAP
-        buy_ok = bool((close > open_) and bear_prev3 >= BEAR_PREV3_LONG and rsi <= RSI_LONG_MAX and close > vwap)
-        sell_ok = bool((close < open_) and bull_prev3 >= BULL_PREV3_SHORT and rsi >= RSI_SHORT_MIN and close < vwap)
+        buy_ok = bool((close > open_) and bear_prev3 >= cfg.BEAR_PREV3_LONG and rsi <= cfg.RSI_LONG_MAX and close > vwap)
+        sell_ok = bool((close < open_) and bull_prev3 >= cfg.BULL_PREV3_SHORT and rsi >= cfg.RSI_SHORT_MIN and close < vwap)
 
         if not buy_ok and not sell_ok:
             return None
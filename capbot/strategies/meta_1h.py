@@ -10,50 +10,49 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
-import numpy as np
 import pandas as pd
 
+from capbot.strategies._kernels import all_finite, move_mean, move_std, rsi_sma
+
+
+# Indicators that must be finite on the signal bar
+_NEED_COLS = ("bb_low_20", "bb_mid_20", "rsi14")
+
 
 @dataclass
 class Signal:
+    __slots__ = ("direction", "entry_price_est", "meta")
+
     direction: str
     entry_price_est: float
     meta: Dict[str, Any]
 
 
 def _sma(s: pd.Series, n: int) -> pd.Series:
-    return s.rolling(n, min_periods=n).mean()
-
-
-def _rsi_sma(close: pd.Series, n: int = 14) -> pd.Series:
-    delta = close.diff()
-    up = delta.clip(lower=0.0)
-    down = (-delta).clip(lower=0.0)
-    up_avg = _sma(up, n)
-    down_avg = _sma(down, n)
-    rs = up_avg / down_avg.replace(0, np.nan)
-    return 100.0 - (100.0 / (1.0 + rs))
+    return pd.Series(move_mean(s, n), index=s.index)
 
 
 class META_1H:
     """META 1h mean reversion strategy (long-only, Bollinger + RSI)."""
 
     def enrich(self, df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
-        d = df.copy()
+        d = df.copy(deep=False)
         c = d["close"].astype(float)
 
         # Bollinger Bands (20, 2)
         d["bb_mid_20"] = _sma(c, 20)
-        bb_std = c.rolling(20, min_periods=20).std()
+        bb_std = move_std(c, 20)
         d["bb_low_20"] = d["bb_mid_20"] - 2 * bb_std
         d["bb_up_20"] = d["bb_mid_20"] + 2 * bb_std
 
         # RSI(14) SMA
-        d["rsi14"] = _rsi_sma(c, 14)
+        d["rsi14"] = rsi_sma(c, 14)
 
         # EMA72 (informational)
         d["ema72"] = c.ewm(span=72, adjust=False).mean()
 
+        d["_indicators_ready"] = all_finite(d, _NEED_COLS)
+
         return d
 
     def signal_on_bar_close(self, df: pd.DataFrame, params: Dict[str, Any]) -> Optional[Signal]:
@@ -61,12 +60,13 @@ class META_1H:
             return None
 
         i = -2
-        row = df.iloc[i]
         ts_utc = df.index[i]
 
-        ts_utc = pd.to_datetime(ts_utc, utc=True, errors="coerce")
-        if ts_utc is pd.NaT:
-            return None
+        # Engine index is already tz-aware UTC; only parse anything else
+        if not isinstance(ts_utc, pd.Timestamp) or ts_utc.tzinfo is None or ts_utc.utcoffset():
+            ts_utc = pd.to_datetime(ts_utc, utc=True, errors="coerce")
+            if ts_utc is pd.NaT:
+                return None
 
         # Hard filter: no Wednesday (UTC)
         if ts_utc.weekday() == 2:
@@ -74,8 +74,7 @@ class META_1H:
 
         # Hard filter: no earnings days (configurable list of dates)
         earnings_dates = params.get("earnings_blackout_dates", [])
-        today_str = ts_utc.strftime("%Y-%m-%d")
-        if today_str in earnings_dates:
+        if earnings_dates and ts_utc.strftime("%Y-%m-%d") in earnings_dates:
             return None
 
         # RTH check: US market hours
@@ -87,11 +86,11 @@ class META_1H:
             return None
 
         # Validate indicators
-        need = ["bb_low_20", "bb_mid_20", "rsi14"]
-        for k in need:
-            v = row.get(k)
-            if v is None or (isinstance(v, float) and (np.isnan(v) or np.isinf(v))):
-                return None
+        ready = df.get("_indicators_ready")
+        if ready is None or not ready.iat[i]:
+            return None
+
+        row = df.iloc[i]
 
         c = float(row["close"])
         bb_low = float(row["bb_low_20"])
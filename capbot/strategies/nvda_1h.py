@@ -15,43 +15,41 @@ from typing import Any, Dict, Optional
 import numpy as np
 import pandas as pd
 
+from capbot.strategies._kernels import all_finite, move_mean, move_std, rsi_sma, safe_div
+
+
+# Indicators that must be finite on the signal bar
+_NEED_COLS = ("bb_low_20", "bb_mid_20", "bb_up_20", "rsi14", "regime_ok")
+
 
 @dataclass
 class Signal:
+    __slots__ = ("direction", "entry_price_est", "meta")
+
     direction: str
     entry_price_est: float
     meta: Dict[str, Any]
 
 
 def _sma(s: pd.Series, n: int) -> pd.Series:
-    return s.rolling(n, min_periods=n).mean()
-
-
-def _rsi_sma(close: pd.Series, n: int = 14) -> pd.Series:
-    delta = close.diff()
-    up = delta.clip(lower=0.0)
-    down = (-delta).clip(lower=0.0)
-    up_avg = _sma(up, n)
-    down_avg = _sma(down, n)
-    rs = up_avg / down_avg.replace(0, np.nan)
-    return 100.0 - (100.0 / (1.0 + rs))
+    return pd.Series(move_mean(s, n), index=s.index)
 
 
 class NVDA_1H:
     """NVDA 1h mean reversion strategy (long + short, with EMA72 regime filter)."""
 
     def enrich(self, df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
-        d = df.copy()
+        d = df.copy(deep=False)
         c = d["close"].astype(float)
 
         # Bollinger Bands (20, 2)
         d["bb_mid_20"] = _sma(c, 20)
-        bb_std = c.rolling(20, min_periods=20).std()
+        bb_std = move_std(c, 20)
         d["bb_low_20"] = d["bb_mid_20"] - 2 * bb_std
         d["bb_up_20"] = d["bb_mid_20"] + 2 * bb_std
 
         # RSI(14) SMA
-        d["rsi14"] = _rsi_sma(c, 14)
+        d["rsi14"] = rsi_sma(c, 14)
 
         # EMA72
         d["ema72"] = c.ewm(span=72, adjust=False).mean()
@@ -60,8 +58,10 @@ class NVDA_1H:
         d["ema72_12h_ago"] = d["ema72"].shift(12)
 
         # Regime filter: |EMA72(t)/EMA72(t-12h) - 1| <= 0.01
-        ratio = d["ema72"] / d["ema72_12h_ago"].replace(0, np.nan)
-        d["regime_ok"] = ((ratio - 1.0).abs() <= 0.01).astype(int)
+        ratio = safe_div(d["ema72"], d["ema72_12h_ago"])
+        d["regime_ok"] = (np.abs(ratio - 1.0) <= 0.01).astype(int)
+
+        d["_indicators_ready"] = all_finite(d, _NEED_COLS)
 
         return d
 
@@ -70,12 +70,13 @@ class NVDA_1H:
             return None
 
         i = -2
-        row = df.iloc[i]
         ts_utc = df.index[i]
 
-        ts_utc = pd.to_datetime(ts_utc, utc=True, errors="coerce")
-        if ts_utc is pd.NaT:
-            return None
+        # Engine index is already tz-aware UTC; only parse anything else
+        if not isinstance(ts_utc, pd.Timestamp) or ts_utc.tzinfo is None or ts_utc.utcoffset():
+            ts_utc = pd.to_datetime(ts_utc, utc=True, errors="coerce")
+            if ts_utc is pd.NaT:
+                return None
 
         # Hard filter: no Monday (UTC)
         if ts_utc.weekday() == 0:
@@ -83,8 +84,7 @@ class NVDA_1H:
 
         # Hard filter: no earnings days (configurable)
         earnings_dates = params.get("earnings_blackout_dates", [])
-        today_str = ts_utc.strftime("%Y-%m-%d")
-        if today_str in earnings_dates:
+        if earnings_dates and ts_utc.strftime("%Y-%m-%d") in earnings_dates:
             return None
 
         # RTH check: US market hours
@@ -96,11 +96,11 @@ class NVDA_1H:
             return None
 
         # Validate indicators
-        need = ["bb_low_20", "bb_mid_20", "bb_up_20", "rsi14", "regime_ok"]
-        for k in need:
-            v = row.get(k)
-            if v is None or (isinstance(v, float) and (np.isnan(v) or np.isinf(v))):
-                return None
+        ready = df.get("_indicators_ready")
+        if ready is None or not ready.iat[i]:
+            return None
+
+        row = df.iloc[i]
 
         # Regime filter must pass
         if int(row["regime_ok"]) != 1:
@@ -112,6 +112,15 @@ class NVDA_1H:
         bb_mid = float(row["bb_mid_20"])
         rsi = float(row["rsi14"])
 
+        # LONG: close < BB lower AND RSI < 30
+        if c < bb_low and rsi < 30:
+            direction = "BUY"
+        # SHORT: close > BB upper AND RSI > 70
+        elif c > bb_up and rsi > 70:
+            direction = "SELL"
+        else:
+            return None
+
         meta = {
             "ts_signal_utc": ts_utc.isoformat(),
             "ts_signal_et": ts_et.isoformat(),
@@ -120,19 +129,9 @@ class NVDA_1H:
             "bb_up_20": bb_up,
             "rsi14": rsi,
             "regime_ok": True,
+            "tp_target": bb_mid,
         }
-
-        # LONG: close < BB lower AND RSI < 30
-        if c < bb_low and rsi < 30:
-            meta["tp_target"] = bb_mid
-            return Signal(direction="BUY", entry_price_est=c, meta=meta)
-
-        # SHORT: close > BB upper AND RSI > 70
-        if c > bb_up and rsi > 70:
-            meta["tp_target"] = bb_mid
-            return Signal(direction="SELL", entry_price_est=c, meta=meta)
-
-        return None
+        return Signal(direction=direction, entry_price_est=c, meta=meta)
 
     def initial_risk(self, entry_price: float, atr_signal: float, sig: Signal, params: Dict[str, Any]) -> Dict[str, Any]:
         """
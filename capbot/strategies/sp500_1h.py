@@ -16,68 +16,61 @@ from typing import Any, Dict, Optional
 import numpy as np
 import pandas as pd
 
+from capbot.strategies._kernels import (
+    all_finite, atr_sma, move_max, move_mean, move_std, rsi_sma, safe_div, shift1,
+)
+
+
+# Indicators that must be finite on the signal bar
+_NEED_COLS = ("sma20", "sma50", "sma200", "atr14", "rsi14", "bb_width", "atr_pct", "dist_sma200_pct", "high_10")
+
 
 @dataclass
 class Signal:
+    __slots__ = ("direction", "entry_price_est", "meta")
+
     direction: str
     entry_price_est: float
     meta: Dict[str, Any]
 
 
 def _sma(s: pd.Series, n: int) -> pd.Series:
-    return s.rolling(n, min_periods=n).mean()
-
-
-def _rsi_sma(close: pd.Series, n: int = 14) -> pd.Series:
-    delta = close.diff()
-    up = delta.clip(lower=0.0)
-    down = (-delta).clip(lower=0.0)
-    up_avg = _sma(up, n)
-    down_avg = _sma(down, n)
-    rs = up_avg / down_avg.replace(0, np.nan)
-    return 100.0 - (100.0 / (1.0 + rs))
-
-
-def _atr_sma(df: pd.DataFrame, n: int = 14) -> pd.Series:
-    h = df["high"].astype(float)
-    l = df["low"].astype(float)
-    c = df["close"].astype(float)
-    prev_c = c.shift(1)
-    tr = pd.concat([(h - l).abs(), (h - prev_c).abs(), (l - prev_c).abs()], axis=1).max(axis=1)
-    return _sma(tr, n)
+    return pd.Series(move_mean(s, n), index=s.index)
 
 
 class SP500_1H:
     """SP500 1h trend-following strategy (long-only)."""
 
     def enrich(self, df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
-        d = df.copy()
+        d = df.copy(deep=False)
         c = d["close"].astype(float)
         h = d["high"].astype(float)
 
         d["sma20"] = _sma(c, 20)
         d["sma50"] = _sma(c, 50)
         d["sma200"] = _sma(c, 200)
-        d["atr14"] = _atr_sma(d, 14)
-        d["rsi14"] = _rsi_sma(c, 14)
+        d["atr14"] = atr_sma(d, 14)
+        d["rsi14"] = rsi_sma(c, 14)
 
         # Bollinger Bands (20, 2)
         bb_mid = d["sma20"]
-        bb_std = c.rolling(20, min_periods=20).std()
+        bb_std = move_std(c, 20)
         d["bb_upper"] = bb_mid + 2 * bb_std
         d["bb_lower"] = bb_mid - 2 * bb_std
-        d["bb_width"] = (d["bb_upper"] - d["bb_lower"]) / bb_mid.replace(0, np.nan)
+        d["bb_width"] = safe_div(d["bb_upper"] - d["bb_lower"], bb_mid)
 
         # ATR%
-        d["atr_pct"] = d["atr14"] / c.replace(0, np.nan)
+        d["atr_pct"] = safe_div(d["atr14"], c)
 
         # Distance from SMA200
-        d["dist_sma200_pct"] = (c - d["sma200"]) / d["sma200"].replace(0, np.nan)
+        d["dist_sma200_pct"] = safe_div(c - d["sma200"], d["sma200"])
 
         # 10-bar breakout: close > max(high[i-10 .. i-1])
-        d["high_10"] = h.shift(1).rolling(10, min_periods=10).max()
+        d["high_10"] = move_max(shift1(h), 10)
         d["breakout_10"] = (c > d["high_10"]).astype(int)
 
+        d["_indicators_ready"] = all_finite(d, _NEED_COLS)
+
         return d
 
     def signal_on_bar_close(self, df: pd.DataFrame, params: Dict[str, Any]) -> Optional[Signal]:
@@ -85,13 +78,13 @@ class SP500_1H:
             return None
 
         i = -2
-        row = df.iloc[i]
         ts_utc = df.index[i]
 
-        # Robust tz handling
-        ts_utc = pd.to_datetime(ts_utc, utc=True, errors="coerce")
-        if ts_utc is pd.NaT:
-            return None
+        # Engine index is already tz-aware UTC; only parse anything else
+        if not isinstance(ts_utc, pd.Timestamp) or ts_utc.tzinfo is None or ts_utc.utcoffset():
+            ts_utc = pd.to_datetime(ts_utc, utc=True, errors="coerce")
+            if ts_utc is pd.NaT:
+                return None
 
         # US/Eastern RTH: 09:30-16:00 (inclusive), no weekends
         ts_et = ts_utc.tz_convert("America/New_York")
@@ -102,11 +95,11 @@ class SP500_1H:
             return None
 
         # Validate indicators
-        need = ["sma20", "sma50", "sma200", "atr14", "rsi14", "bb_width", "atr_pct", "dist_sma200_pct", "high_10"]
-        for k in need:
-            v = row.get(k)
-            if v is None or (isinstance(v, float) and (np.isnan(v) or np.isinf(v))):
-                return None
+        ready = df.get("_indicators_ready")
+        if ready is None or not ready.iat[i]:
+            return None
+
+        row = df.iloc[i]
 
         c = float(row["close"])
         sma50 = float(row["sma50"])
@@ -122,16 +115,17 @@ class SP500_1H:
         # close[i-1] < sma20[i-1] AND close[i-2] < sma20[i-2] AND close[i] > sma20[i]
         entry_a = False
         if len(df) >= 4:
-            prev1 = df.iloc[i - 1]
-            prev2 = df.iloc[i - 2]
-            p1_ok = float(prev1.get("close", np.nan)) < float(prev1.get("sma20", np.nan)) if not np.isnan(float(prev1.get("sma20", np.nan))) else False
-            p2_ok = float(prev2.get("close", np.nan)) < float(prev2.get("sma20", np.nan)) if not np.isnan(float(prev2.get("sma20", np.nan))) else False
+            # Positional reads; a NaN sma20 compares False
+            close_a = df["close"].to_numpy(dtype=np.float64)
+            sma20_a = df["sma20"].to_numpy(dtype=np.float64)
+            p1_ok = close_a[i - 1] < sma20_a[i - 1]
+            p2_ok = close_a[i - 2] < sma20_a[i - 2]
             if p1_ok and p2_ok and c > sma20:
                 entry_a = True
 
         # Entry B: 10-bar breakout with filters
         entry_b = False
-        if int(row.get("breakout_10", 0)) == 1:
+        if int(row["breakout_10"]) == 1:
             atr_pct = float(row["atr_pct"])
             bb_w = float(row["bb_width"])
             dist_200 = float(row["dist_sma200_pct"])
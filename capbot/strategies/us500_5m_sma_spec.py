@@ -5,39 +5,55 @@ from typing import Any, Dict, Optional
 import numpy as np
 import pandas as pd
 
-@dataclass
-class Signal:
-    direction: str        # "BUY" | "SELL"
-    entry_price_est: float
-    meta: Dict[str, Any]
+from capbot.strategies._kernels import (
+    all_finite, sma_bar_indicators, with_columns,
+)
 
-def _sma(s: pd.Series, n: int) -> pd.Series:
-    return s.rolling(n).mean()
+# Columns added by enrich, in sma_bar_indicators() order
+_ENRICH_COLS = ("range", "body_ratio", "vol_ma20", "vol_rel", "bear_prev3", "bull_prev3", "rsi14", "atr14")
+# Indicators that must be finite on the signal bar
+_NEED_COLS = ("body_ratio", "vol_ma20", "vol_rel", "rsi14", "atr14", "bear_prev3", "bull_prev3")
 
-def rsi_sma(close: pd.Series, n: int = 14) -> pd.Series:
-    delta = close.diff()
-    up = delta.clip(lower=0.0)
-    down = (-delta).clip(lower=0.0)
-    up_sma = _sma(up, n)
-    down_sma = _sma(down, n)
+_NY = "America/New_York"
 
-    # down==0 => RSI invalid (no signal)
-    rs = up_sma / down_sma.replace(0, np.nan)
-    rsi = 100.0 - (100.0 / (1.0 + rs))
-    return rsi
+# Signal thresholds (fixed by the spec)
+_BODY_MIN = 0.70
+_VOL_REL_MIN = 0.70
+_RSI_LONG_MAX = 75.0
+_RSI_SHORT_MIN = 40.0
+_PREV3_MIN = 2
 
-def atr_sma(df: pd.DataFrame, n: int = 14) -> pd.Series:
-    high = df["high"].astype(float)
-    low = df["low"].astype(float)
-    close = df["close"].astype(float)
-    prev_close = close.shift(1)
 
-    tr1 = (high - low).abs()
-    tr2 = (high - prev_close).abs()
-    tr3 = (low - prev_close).abs()
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+@dataclass
+class Signal:
+    __slots__ = ("direction", "entry_price_est", "meta")
 
-    return _sma(tr, n)
+    direction: str        # "BUY" | "SELL"
+    entry_price_est: float
+    meta: Dict[str, Any]
+
+def _utc_index(index: pd.Index) -> pd.DatetimeIndex:
+    """Index -> tz-aware UTC DatetimeIndex; naive is UTC, numbers are epoch s or ms."""
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is None:
+            return index.tz_localize("UTC")
+        return index if str(index.tz) == "UTC" else index.tz_convert("UTC")
+    v = index.to_numpy()
+    if v.dtype.kind in "iuf":
+        # Unit per value: ms above 1e10, else seconds
+        v = np.trunc(v.astype(np.float64))
+        ms = np.where(v > 10_000_000_000, v, v * 1000.0)
+        return pd.DatetimeIndex(pd.to_datetime(ms, unit="ms", utc=True, errors="coerce"))
+    return pd.DatetimeIndex(pd.to_datetime(v, utc=True, errors="coerce"))
+
+def _session_gate(utc: pd.DatetimeIndex) -> np.ndarray:
+    """Per bar of a UTC index: RTH NY 09:30 <= hh:mm <= 16:00 (inclusive) and not Thursday UTC."""
+    # Integer minutes since epoch (UTC and NY wall clock); 1970-01-01 was a Thursday
+    m_utc = utc.tz_localize(None).to_numpy("datetime64[m]").view(np.int64)
+    m_ny = utc.tz_convert(_NY).tz_localize(None).to_numpy("datetime64[m]").view(np.int64)
+    mod = m_ny % 1440
+    ok = (mod >= 9 * 60 + 30) & (mod <= 16 * 60) & (m_utc // 1440 % 7 != 0)
+    return ok & ~np.asarray(utc.isna())
 
 class US500_5m_SMA_SPEC:
     """
@@ -49,73 +65,41 @@ class US500_5m_SMA_SPEC:
     """
 
     def enrich(self, df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
-        d = df.copy()
-
-        # Body ratio
-        rng = (d["high"] - d["low"]).astype(float)
-        d["range"] = rng
-        d["body_ratio"] = (d["close"] - d["open"]).abs() / rng.replace(0, np.nan)
-
-        # Relative volume (SMA20 including current bar, no shift)
-        vol = d["volume"].astype(float)
-        d["vol_ma20"] = vol.rolling(20).mean()
-        d["vol_rel"] = vol / d["vol_ma20"].replace(0, np.nan)
-
-        # Prev3 excludes signal bar: shift(1).rolling(3).sum()
-        bear = (d["close"] < d["open"]).astype(int)
-        bull = (d["close"] > d["open"]).astype(int)
-        d["bear_prev3"] = bear.shift(1).rolling(3).sum()
-        d["bull_prev3"] = bull.shift(1).rolling(3).sum()
-
-        # RSI/ATR SMA
-        d["rsi14"] = rsi_sma(d["close"].astype(float), 14)
-        d["atr14"] = atr_sma(d, 14)
-
-        return d
+        # One pass: body ratio, relative volume (SMA20 incl. current bar),
+        # prev3 (excludes signal bar), RSI/ATR as SMA14
+        cols = dict(zip(_ENRICH_COLS, sma_bar_indicators(df, 20, 14, 14)))
+        cols["_indicators_ready"] = all_finite(cols, _NEED_COLS)
+        # Epoch/naive/other-tz index is normalised once here, not per signal
+        utc = _utc_index(df.index)
+        cols["_gate_ok"] = _session_gate(utc)
+        out = with_columns(df, cols)
+        if utc is not df.index:
+            out.index = utc
+        return out
 
     def signal_on_bar_close(self, df: pd.DataFrame, params: Dict[str, Any]) -> Optional[Signal]:
         if df is None or len(df) < 50:
             return None
 
+        # Engine passes the enriched frame; only enrich a raw one
+        if "_gate_ok" not in df.columns:
+            df = self.enrich(df, params)
+
         # Signal bar = last closed candle
         i = -2
-        row = df.iloc[i]
-        ts_utc = df.index[i]
 
-        # Robust tz handling (fix int/naive index)
-        if isinstance(ts_utc, (int, float)):
-            v = int(ts_utc)
-            unit = 'ms' if v > 10_000_000_000 else 's'
-            ts_utc = pd.to_datetime(v, unit=unit, utc=True, errors='coerce')
-        else:
-            ts_utc = pd.to_datetime(ts_utc, utc=True, errors='coerce')
-        if ts_utc is pd.NaT:
-            return None
-        ts_ny = ts_utc.tz_convert('America/New_York')
-
-        # RTH NY: 09:30 <= hh:mm <= 16:00 (inclusive)
-        hhmm = (ts_ny.hour, ts_ny.minute)
-        in_rth = (hhmm >= (9, 30)) and (hhmm <= (16, 0))
-        if not in_rth:
-            return None
-
-        # No Thursday UTC
-        if ts_utc.weekday() == 3:
+        # RTH NY / no-Thursday gate and indicator readiness come from enrich
+        if not df["_gate_ok"].iat[i] or not df["_indicators_ready"].iat[i]:
             return None
 
-        # Validate indicators
-        need = ["body_ratio", "vol_ma20", "vol_rel", "rsi14", "atr14", "bear_prev3", "bull_prev3"]
-        for k in need:
-            v = row.get(k)
-            if v is None or (isinstance(v, float) and (np.isnan(v) or np.isinf(v))):
-                return None
-
+        # Row lookup only once the bar has passed the cheap gates
+        row = df.iloc[i]
         if float(row["range"]) <= 0:
             return None
 
         br = float(row["body_ratio"])
         vr = float(row["vol_rel"])
-        if br < 0.70 or vr < 0.70:
+        if br < _BODY_MIN or vr < _VOL_REL_MIN:
             return None
 
         close_px = float(row["close"])
@@ -124,6 +108,17 @@ class US500_5m_SMA_SPEC:
         bear3 = float(row["bear_prev3"])
         bull3 = float(row["bull_prev3"])
 
+        # LONG
+        if (close_px > open_px) and (bear3 >= _PREV3_MIN) and (rsi < _RSI_LONG_MAX):
+            direction = "BUY"
+        # SHORT
+        elif (close_px < open_px) and (bull3 >= _PREV3_MIN) and (rsi > _RSI_SHORT_MIN):
+            direction = "SELL"
+        else:
+            return None
+
+        ts_utc = df.index[i]
+        ts_ny = ts_utc.tz_convert(_NY)
         meta = {
             "ts_signal_utc": ts_utc.isoformat(),
             "ts_signal_ny": ts_ny.isoformat(),
@@ -131,18 +126,11 @@ class US500_5m_SMA_SPEC:
             "body_ratio": br, "vol_rel": vr,
             "rsi14": rsi, "atr14": float(row["atr14"]),
         }
-
-        # LONG
-        if (close_px > open_px) and (bear3 >= 2) and (rsi < 75):
+        if direction == "BUY":
             meta["bear_prev3"] = bear3
-            return Signal(direction="BUY", entry_price_est=close_px, meta=meta)
-
-        # SHORT
-        if (close_px < open_px) and (bull3 >= 2) and (rsi > 40):
+        else:
             meta["bull_prev3"] = bull3
-            return Signal(direction="SELL", entry_price_est=close_px, meta=meta)
-
-        return None
+        return Signal(direction=direction, entry_price_est=close_px, meta=meta)
 
     def initial_risk(self, entry_price: float, atr_signal: float, sig: Signal, params: Dict[str, Any]) -> Dict[str, Any]:
         """SL/TP with ATR_entry: BUY SL=entry-1*ATR, TP=entry+3*ATR; SELL reversed."""
@@ -3,11 +3,23 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+import numpy as np
 import pandas as pd
 
+from capbot.domain.schedule import utc_offsets_ns
+from capbot.strategies._kernels import all_finite, ewm_mean, move_mean, prev3_counts, safe_div, segment_cumsum, true_range, with_columns
+
+
+_NS_PER_DAY = 86_400_000_000_000
+
+# Indicators that must be finite on the signal bar
+_NEED_COLS = ("body_ratio", "vol_rel", "rsi14", "atr14", "vwap", "bear_prev3", "bull_prev3")
+
 
 @dataclass
 class Signal:
+    __slots__ = ("direction", "entry_price_est", "meta")
+
     direction: str               # "BUY" | "SELL"
     entry_price_est: float       # for logging; engine uses next bar open for entry
     meta: Dict[str, Any]
@@ -15,7 +27,7 @@ class Signal:
 
 def _rma(series: pd.Series, length: int) -> pd.Series:
     # Wilder RMA = EMA(alpha=1/length, adjust=False)
-    return series.ewm(alpha=1.0 / float(length), adjust=False).mean()
+    return pd.Series(ewm_mean(series, 1.0 / float(length)), index=series.index)
 
 
 def rsi_wilder(close: pd.Series, length: int = 14) -> pd.Series:
@@ -24,23 +36,13 @@ def rsi_wilder(close: pd.Series, length: int = 14) -> pd.Series:
     down = (-delta).clip(lower=0.0)
     avg_up = _rma(up, length)
     avg_down = _rma(down, length)
-    rs = avg_up / avg_down.replace(0, pd.NA)
-    out = 100.0 - (100.0 / (1.0 + rs))
-    return out
+    rs = safe_div(avg_up, avg_down)
+    return pd.Series(100.0 - (100.0 / (1.0 + rs)), index=close.index)
 
 
 def atr_wilder(df: pd.DataFrame, length: int = 14) -> pd.Series:
-    high = df["high"]
-    low = df["low"]
-    close = df["close"]
-    prev_close = close.shift(1)
-
-    tr1 = (high - low).abs()
-    tr2 = (high - prev_close).abs()
-    tr3 = (low - prev_close).abs()
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-
-    return _rma(tr, length)
+    # true_range() is an ndarray; feed it to the RMA kernel directly
+    return pd.Series(ewm_mean(true_range(df), 1.0 / float(length)), index=df.index)
 
 
 def vwap_intraday_reset_berlin(df: pd.DataFrame, tz_name: str = "Europe/Berlin") -> pd.Series:
@@ -62,23 +64,98 @@ def vwap_intraday_reset_berlin(df: pd.DataFrame, tz_name: str = "Europe/Berlin")
     if not isinstance(idx, pd.DatetimeIndex):
         idx = pd.DatetimeIndex(idx)
 
-    # 3) Ensure tz-aware UTC
-    if idx.tz is None:
-        idx = idx.tz_localize("UTC")
-    else:
-        idx = idx.tz_convert("UTC")
+    # 3) UTC epoch ns (naive timestamps are taken as UTC; unit-independent)
+    utc_ns = idx.as_unit("ns").asi8
+    nat = np.asarray(idx.isna())
+    if nat.any():
+        utc_ns = np.where(nat, 0, utc_ns)
 
-    # 4) Day key for intraday reset (local timezone)
-    local = idx.tz_convert(tz_name)
-    day_key = local.normalize()
+    # 4) Day key for intraday reset (local timezone): days since epoch of the
+    #    local wall clock, from the zone's offset table instead of tz_convert.
+    #    An int64 key groups far faster than normalized tz-aware timestamps.
+    day_key = (utc_ns + utc_offsets_ns(tz_name, utc_ns)) // _NS_PER_DAY
 
     # 5) Typical price and intraday cumulative sums
     tp = (df["high"].astype(float) + df["low"].astype(float) + df["close"].astype(float)) / 3.0
     vol = df["volume"].astype(float).fillna(0.0)
 
-    cum_pv = (tp * vol).groupby(day_key).cumsum()
-    cum_v = vol.groupby(day_key).cumsum().replace(0.0, float("nan"))
-    return cum_pv / cum_v
+    pv = tp * vol
+    if not nat.any() and (day_key[1:] >= day_key[:-1]).all():
+        # Time-ordered bars: each day is one contiguous run, so a running sum
+        # that restarts on key change replaces the groupby.
+        return pd.Series(safe_div(segment_cumsum(pv, day_key), segment_cumsum(vol, day_key)), index=df.index)
+
+    cum_pv = pv.groupby(day_key).cumsum()
+    cum_v = vol.groupby(day_key).cumsum()
+    vwap = safe_div(cum_pv, cum_v)
+    vwap[nat] = np.nan
+    return pd.Series(vwap, index=df.index)
+
+@dataclass(frozen=True)
+class _Thresholds:
+    """Signal thresholds parsed once from the params dict."""
+    __slots__ = (
+        "BODY_MIN", "VOL_REL_MIN", "RSI_LONG_MAX", "RSI_SHORT_MIN", "BEAR_PREV3_LONG",
+        "BULL_PREV3_SHORT", "VWAP_DISTANCE_K",
+    )
+
+    BODY_MIN: float
+    VOL_REL_MIN: float
+    RSI_LONG_MAX: float
+    RSI_SHORT_MIN: float
+    BEAR_PREV3_LONG: int
+    BULL_PREV3_SHORT: int
+    VWAP_DISTANCE_K: float
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "_Thresholds":
+        return cls(
+            BODY_MIN=float(params.get("BODY_MIN", 0.70)),
+            VOL_REL_MIN=float(params.get("VOL_REL_MIN", 0.70)),
+            RSI_LONG_MAX=float(params.get("RSI_LONG_MAX", 75)),
+            RSI_SHORT_MIN=float(params.get("RSI_SHORT_MIN", 40)),
+            BEAR_PREV3_LONG=int(params.get("BEAR_PREV3_LONG", 2)),
+            BULL_PREV3_SHORT=int(params.get("BULL_PREV3_SHORT", 2)),
+            VWAP_DISTANCE_K=float(params.get("VWAP_DISTANCE_K", 0.20)),
+        )
+
+
+def _decide(
+    t: _Thresholds,
+    br: float,
+    vr: float,
+    close_px: float,
+    open_px: float,
+    rsi_v: float,
+    atr_v: float,
+    vwap_px: float,
+    bear3: int,
+    bull3: int,
+) -> Optional[Signal]:
+    """VWAP distance gate + long/short conditions for a bar that passed the body/volume gate."""
+    # VWAP distance gate
+    if abs(close_px - vwap_px) < (t.VWAP_DISTANCE_K * atr_v):
+        return None
+
+    # Signal conditions
+    cond_long = (close_px > vwap_px) and (bear3 >= t.BEAR_PREV3_LONG) and (rsi_v <= t.RSI_LONG_MAX) and (close_px > open_px)
+    cond_short = (close_px < vwap_px) and (bull3 >= t.BULL_PREV3_SHORT) and (rsi_v >= t.RSI_SHORT_MIN) and (close_px < open_px)
+
+    if not (cond_long or cond_short):
+        return None
+
+    meta = {
+        "body_ratio": br,
+        "vol_rel": vr,
+        "rsi14": rsi_v,
+        "atr14": atr_v,
+        "vwap": vwap_px,
+        "bear_prev3": bear3,
+        "bull_prev3": bull3,
+        "vwap_distance_k": t.VWAP_DISTANCE_K,
+    }
+    return Signal(direction="BUY" if cond_long else "SELL", entry_price_est=close_px, meta=meta)
+
 
 class VWAPPullbackRSI:
     """
@@ -88,98 +165,80 @@ class VWAPPullbackRSI:
 
     name = "vwap_pullback_rsi"
 
+    def __init__(self) -> None:
+        self._thr_params: Optional[Dict[str, Any]] = None
+        self._thr: Optional[_Thresholds] = None
+
+    def _thresholds(self, params: Dict[str, Any]) -> _Thresholds:
+        # Same params dict every bar; a reload hands over a new one
+        if params is not self._thr_params or self._thr is None:
+            self._thr = _Thresholds.from_params(params)
+            self._thr_params = params
+        return self._thr
+
     def enrich(self, df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
         vol_window = int(params.get("VOL_WINDOW", 20))
         rsi_len = int(params.get("RSI_PERIOD", 14))
         atr_len = int(params.get("ATR_PERIOD", 14))
         vwap_tz = str(params.get("VWAP_TZ", "Europe/Berlin"))
 
-        d = df.copy()
+        # New columns only; attached to df in one concat at the end
+        o = df["open"].to_numpy(dtype=np.float64)
+        c = df["close"].to_numpy(dtype=np.float64)
+        cols: Dict[str, Any] = {}
 
         # Body ratio
-        rng = (d["high"] - d["low"]).astype(float)
-        d["range"] = rng
-        d["body_ratio"] = (d["close"] - d["open"]).abs() / rng.replace(0, pd.NA)
-        d["body_ratio"] = d["body_ratio"].fillna(0.0)
+        rng = (df["high"] - df["low"]).to_numpy(dtype=np.float64)
+        cols["range"] = rng
+        body = safe_div(np.abs(c - o), rng)
+        body[np.isnan(body)] = 0.0
+        cols["body_ratio"] = body
 
         # Relative volume
-        d["vol_sma20"] = d["volume"].rolling(vol_window, min_periods=vol_window).mean()
-        d["vol_rel"] = d["volume"] / d["vol_sma20"].replace(0, pd.NA)
+        cols["vol_sma20"] = move_mean(df["volume"], vol_window)
+        cols["vol_rel"] = safe_div(df["volume"], cols["vol_sma20"])
 
         # Prev3 bulls/bears (shift(1).rolling(3).sum())
-        d["bear"] = (d["close"] < d["open"]).astype(int)
-        d["bull"] = (d["close"] > d["open"]).astype(int)
-        d["bear_prev3"] = d["bear"].shift(1).rolling(3).sum()
-        d["bull_prev3"] = d["bull"].shift(1).rolling(3).sum()
+        cols["bear"] = (c < o).astype(np.uint8)
+        cols["bull"] = (c > o).astype(np.uint8)
+        cols["bear_prev3"], cols["bull_prev3"] = prev3_counts(df)
 
         # RSI/ATR Wilder
-        d["rsi14"] = rsi_wilder(d["close"].astype(float), rsi_len)
-        d["atr14"] = atr_wilder(d, atr_len)
+        cols["rsi14"] = rsi_wilder(df["close"].astype(float), rsi_len).to_numpy()
+        cols["atr14"] = atr_wilder(df, atr_len).to_numpy()
 
         # Intraday VWAP (resets at 00:00 local)
-        d["vwap"] = vwap_intraday_reset_berlin(d, vwap_tz)
+        cols["vwap"] = vwap_intraday_reset_berlin(df, vwap_tz).to_numpy()
 
-        return d
+        cols["_indicators_ready"] = all_finite(cols, _NEED_COLS)
+        return with_columns(df, cols)
 
     def signal_on_bar_close(self, df: pd.DataFrame, params: Dict[str, Any]) -> Optional[Signal]:
         if df is None or df.empty or len(df) < 50:
             return None
 
         # signal_bar = last CLOSED candle
-        last = df.iloc[-2]
-
-        close_px = float(last["close"])
-        open_px = float(last["open"])
-
-        BODY_MIN = float(params.get("BODY_MIN", 0.70))
-        VOL_REL_MIN = float(params.get("VOL_REL_MIN", 0.70))
-
-        RSI_LONG_MAX = float(params.get("RSI_LONG_MAX", 75))
-        RSI_SHORT_MIN = float(params.get("RSI_SHORT_MIN", 40))
-        BEAR_PREV3_LONG = int(params.get("BEAR_PREV3_LONG", 2))
-        BULL_PREV3_SHORT = int(params.get("BULL_PREV3_SHORT", 2))
+        i = len(df) - 2
 
-        VWAP_DISTANCE_K = float(params.get("VWAP_DISTANCE_K", 0.20))
-
-        need = ["body_ratio", "vol_rel", "rsi14", "atr14", "vwap", "bear_prev3", "bull_prev3"]
-        if any(pd.isna(last[k]) for k in need):
-            return None
-
-        br = float(last["body_ratio"])
-        vr = float(last["vol_rel"])
-        if br < BODY_MIN or vr < VOL_REL_MIN:
+        ready = df.get("_indicators_ready")
+        if ready is None or not ready.iat[i]:
             return None
 
-        rsi_v = float(last["rsi14"])
-        atr_v = float(last["atr14"])
-        vwap_px = float(last["vwap"])
-        bear3 = int(last["bear_prev3"])
-        bull3 = int(last["bull_prev3"])
+        t = self._thresholds(params)
 
-        # VWAP distance gate
-        if abs(close_px - vwap_px) < (VWAP_DISTANCE_K * atr_v):
+        # Body/volume gate rejects most bars; read just those two cells first
+        br = float(df["body_ratio"].iat[i])
+        vr = float(df["vol_rel"].iat[i])
+        if br < t.BODY_MIN or vr < t.VOL_REL_MIN:
             return None
 
-        # Signal conditions
-        cond_long = (close_px > vwap_px) and (bear3 >= BEAR_PREV3_LONG) and (rsi_v <= RSI_LONG_MAX) and (close_px > open_px)
-        cond_short = (close_px < vwap_px) and (bull3 >= BULL_PREV3_SHORT) and (rsi_v >= RSI_SHORT_MIN) and (close_px < open_px)
-
-        meta = {
-            "body_ratio": br,
-            "vol_rel": vr,
-            "rsi14": rsi_v,
-            "atr14": atr_v,
-            "vwap": vwap_px,
-            "bear_prev3": bear3,
-            "bull_prev3": bull3,
-            "vwap_distance_k": VWAP_DISTANCE_K,
-        }
-
-        if cond_long:
-            return Signal(direction="BUY", entry_price_est=close_px, meta=meta)
-        if cond_short:
-            return Signal(direction="SELL", entry_price_est=close_px, meta=meta)
-        return None
+        last = df.iloc[i]
+        return _decide(
+            t, br, vr,
+            float(last["close"]), float(last["open"]),
+            float(last["rsi14"]), float(last["atr14"]), float(last["vwap"]),
+            int(last["bear_prev3"]), int(last["bull_prev3"]),
+        )
 
     def initial_risk(self, entry_price: float, atr_signal_bar: float, sig: Signal, params: Dict[str, Any]) -> Dict[str, Any]:
         """
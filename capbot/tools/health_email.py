@@ -3,10 +3,18 @@ from __future__ import annotations
 import os
 import subprocess
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 from capbot.app.notifier import email_event
 
+try:  # optional: query systemd over D-Bus instead of forking systemctl
+    import dbus  # type: ignore
+    _HAVE_DBUS = True
+except ImportError:
+    _HAVE_DBUS = False
+
+_unit_paths: Dict[str, Any] = {}
+
 
 def _env(name: str, default: str = "") -> str:
     v = os.getenv(name)
@@ -17,7 +25,28 @@ def _run(cmd: list[str]) -> str:
     return subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True).strip()
 
 
+def _active_state_dbus(service: str) -> str:
+    bus = dbus.SystemBus()
+    path = _unit_paths.get(service)
+    if path is None:
+        manager = dbus.Interface(
+            bus.get_object("org.freedesktop.systemd1", "/org/freedesktop/systemd1"),
+            "org.freedesktop.systemd1.Manager",
+        )
+        # LoadUnit also resolves units that are not loaded (GetUnit would raise)
+        path = manager.LoadUnit(service)
+        _unit_paths[service] = path
+    unit = bus.get_object("org.freedesktop.systemd1", path)
+    return str(unit.Get("org.freedesktop.systemd1.Unit", "ActiveState",
+                        dbus_interface="org.freedesktop.DBus.Properties"))
+
+
 def _is_active(service: str) -> bool:
+    if _HAVE_DBUS:
+        try:
+            return _active_state_dbus(service) == "active"
+        except Exception:
+            _unit_paths.pop(service, None)
     try:
         out = _run(["systemctl", "is-active", service])
         return out.strip() == "active"
@@ -25,12 +54,35 @@ def _is_active(service: str) -> bool:
         return False
 
 
-def _tail(path: str, n: int = 1) -> str:
+def _tail_from_file(f, n: int = 1, block: int = 4096) -> str:
+    """Last line of `tail -n n` for an open binary file, reading only its end."""
+    f.seek(0, os.SEEK_END)
+    pos = f.tell()
+    buf = b""
+    # n lines plus the newline before them must be in view
+    while pos > 0 and buf.count(b"\n") <= n:
+        step = min(block, pos)
+        pos -= step
+        f.seek(pos)
+        buf = f.read(step) + buf
+    if buf.endswith(b"\n"):
+        buf = buf[:-1]
+    out = b"\n".join(buf.split(b"\n")[-n:]).decode("utf-8", "replace").strip()
+    return out.splitlines()[-1] if out else ""
+
+
+def _probe_log(path: str, now_ts: float) -> Tuple[float, str]:
+    """(age in minutes, last line) from one open(): fstat and tail share the fd."""
     try:
-        out = _run(["tail", "-n", str(n), path])
-        return out.splitlines()[-1] if out else ""
+        with open(path, "rb") as f:
+            mtime = os.fstat(f.fileno()).st_mtime
+            age = max(0.0, (now_ts - mtime) / 60.0)
+            try:
+                return age, _tail_from_file(f)
+            except Exception:
+                return age, ""
     except Exception:
-        return ""
+        return 9999.0, ""
 
 
 def main() -> int:
@@ -46,15 +98,8 @@ def main() -> int:
 
     active = _is_active(service)
 
-    # log age
-    log_age_min = 9999.0
-    try:
-        mtime = os.path.getmtime(logfile)
-        log_age_min = max(0.0, (now.timestamp() - mtime) / 60.0)
-    except Exception:
-        pass
-
-    last = _tail(logfile, 1)
+    # log age + last line
+    log_age_min, last = _probe_log(logfile, now.timestamp())
 
     ok = bool(active and (log_age_min <= max_age_min))
 
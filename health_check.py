@@ -6,6 +6,7 @@ Usage:
   python health_check.py
   python health_check.py --json
   python health_check.py --telegram  # send health report via Telegram
+  python health_check.py --watch     # keep running, print status changes
 
 Checks:
   - Lock file exists (bot is running)
@@ -18,11 +19,21 @@ Checks:
 import argparse
 import json
 import os
+import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
+from capbot.domain.state_store import loads_json
+
+try:
+    from inotify_simple import INotify, flags as _in_flags  # optional, for --watch
+except ImportError:
+    INotify = None
+
 
 def _pid_is_alive(pid: int) -> bool:
     try:
@@ -32,24 +43,79 @@ def _pid_is_alive(pid: int) -> bool:
         return False
 
 
-def _check_bot(bot_id: str, base_dir: Path = None) -> dict:
-    """Check health of a single bot. Returns status dict."""
+def _scan_dir(path: Path) -> dict:
+    """{file name: (mtime, size)} for everything in path, from one scandir pass."""
+    out = {}
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                out[entry.name] = (st.st_mtime, st.st_size)
+    except OSError:
+        pass
+    return out
+
+
+def _file_stat(path: Path, listings: dict = None):
+    """(mtime, size) of path or None if missing; served from listings (dir -> _scan_dir) when given."""
+    if listings is None:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime, st.st_size
+    d = path.parent
+    if d not in listings:
+        listings[d] = _scan_dir(d)
+    return listings[d].get(path.name)
+
+
+def _read_state(state_path: Path, stat: tuple, cache: dict = None) -> dict:
+    """Parsed state JSON, reusing cache[state_path] while (mtime, size) is unchanged."""
+    if cache is None:
+        return loads_json(state_path.read_bytes())
+    key = str(state_path)
+    hit = cache.get(key)
+    if hit is not None and hit[0] == stat:
+        return hit[1]
+    st = loads_json(state_path.read_bytes())
+    cache[key] = (stat, st)
+    return st
+
+
+@lru_cache(maxsize=256)
+def _safe_id(bot_id: str) -> str:
+    return "".join(ch for ch in bot_id if ch.isalnum() or ch in "-_").strip() or "bot"
+
+
+def _bot_dirs(base_dir: Path = None) -> tuple:
+    """(state_dir, log_dir, lock_dir) for base_dir, CAPBOT_BASEDIR or the home directory."""
     if base_dir:
-        state_dir = base_dir / "state"
-        log_dir = base_dir / "log"
-        lock_dir = base_dir / "lock"
-    else:
-        home = Path.home()
-        basedir = os.environ.get("CAPBOT_BASEDIR", "").strip()
-        if basedir:
-            b = Path(basedir)
-            state_dir = b / "state"
-            log_dir = b / "log"
-            lock_dir = b / "lock"
-        else:
-            state_dir = log_dir = lock_dir = home
-
-    safe = "".join(ch for ch in bot_id if ch.isalnum() or ch in "-_").strip() or "bot"
+        return base_dir / "state", base_dir / "log", base_dir / "lock"
+    basedir = os.environ.get("CAPBOT_BASEDIR", "").strip()
+    if basedir:
+        b = Path(basedir)
+        return b / "state", b / "log", b / "lock"
+    home = Path.home()
+    return home, home, home
+
+
+def _check_bot(bot_id: str, base_dir: Path = None, listings: dict = None, now: float = None,
+               state_cache: dict = None) -> dict:
+    """
+    Check health of a single bot. Returns status dict.
+    listings: shared {dir: _scan_dir(dir)} cache so checking many bots
+    scans each directory once instead of stat()ing every file.
+    now: epoch seconds shared by all bots of one run (default: time.time()).
+    state_cache: in-memory {path: ((mtime, size), state)} kept by a long-running caller
+    (--watch); the state JSON is then only parsed when it changed.
+    """
+    state_dir, log_dir, lock_dir = _bot_dirs(base_dir)
+
+    safe = _safe_id(bot_id)
 
     state_path = state_dir / f".capbot_state_{safe}.json"
     log_path = log_dir / f"capbot_events_{safe}.log"
@@ -71,10 +137,19 @@ def _check_bot(bot_id: str, base_dir: Path = None) -> dict:
         "issues": [],
     }
 
-    # Check lock file
-    if lock_path.exists():
+    # Check lock file: the directory scan answers "exists?" when we have it,
+    # otherwise the read itself does (no separate stat)
+    try:
+        if listings is not None and _file_stat(lock_path, listings) is None:
+            raise FileNotFoundError(str(lock_path))
+        lock_text = lock_path.read_text()
+    except FileNotFoundError:
+        lock_text = None
+    except Exception:
+        lock_text = ""
+    if lock_text is not None:
         try:
-            pid = int(lock_path.read_text().strip())
+            pid = int(lock_text.strip())
             status["pid"] = pid
             status["running"] = _pid_is_alive(pid)
             if not status["running"]:
@@ -85,15 +160,17 @@ def _check_bot(bot_id: str, base_dir: Path = None) -> dict:
         status["issues"].append("No lock file (bot not running)")
 
     # Check state file
-    now = time.time()
-    if state_path.exists():
+    if now is None:
+        now = time.time()
+    state_st = _file_stat(state_path, listings)
+    if state_st is not None:
         try:
-            age = now - state_path.stat().st_mtime
+            age = now - state_st[0]
             status["state_age_sec"] = int(age)
             if age > 600:
                 status["issues"].append(f"State file stale ({int(age)}s old)")
 
-            st = json.loads(state_path.read_text())
+            st = _read_state(state_path, state_st, state_cache)
             pos = st.get("pos") or {}
             if pos.get("deal_id"):
                 status["in_position"] = True
@@ -106,8 +183,12 @@ def _check_bot(bot_id: str, base_dir: Path = None) -> dict:
             cd = st.get("cooldown_until_iso")
             if cd:
                 try:
-                    cd_ts = datetime.fromisoformat(cd.replace("Z", "+00:00"))
-                    if cd_ts > datetime.now(timezone.utc):
+                    cd_ts = st.get("cooldown_until_epoch")
+                    if not isinstance(cd_ts, (int, float)):
+                        # state written before the epoch field existed
+                        cd_dt = datetime.fromisoformat(cd[:-1] + "+00:00" if cd.endswith("Z") else cd)
+                        cd_ts = cd_dt.timestamp() if cd_dt.tzinfo is not None else 0.0
+                    if cd_ts > now:
                         status["cooldown_active"] = True
                         status["issues"].append(f"Circuit breaker active until {cd}")
                 except Exception:
@@ -117,10 +198,12 @@ def _check_bot(bot_id: str, base_dir: Path = None) -> dict:
     else:
         status["issues"].append("No state file")
 
-    # Check log file
-    if log_path.exists():
+    # Check log file (skipped when the lock names a dead PID; that is reported already)
+    dead_pid = status["pid"] is not None and not status["running"]
+    log_st = None if dead_pid else _file_stat(log_path, listings)
+    if log_st is not None:
         try:
-            age = now - log_path.stat().st_mtime
+            age = now - log_st[0]
             status["log_age_sec"] = int(age)
             if age > 600:
                 status["issues"].append(f"Log file stale ({int(age)}s old)")
@@ -132,8 +215,21 @@ def _check_bot(bot_id: str, base_dir: Path = None) -> dict:
     return status
 
 
-def _discover_bots() -> list:
-    """Find all bot IDs from lock/state files."""
+# bot id from lock/state file names (discovery), and additionally log names (--watch)
+_BOT_FILE_RE = re.compile(r"\.capbot_lock_(.+)\.lock|\.capbot_state_(.+)\.json")
+_BOT_ANY_FILE_RE = re.compile(r"\.capbot_lock_(.+)\.lock|\.capbot_state_(.+)\.json|capbot_events_(.+)\.log")
+
+
+def _bot_id_from_name(name: str, pattern: re.Pattern = _BOT_ANY_FILE_RE):
+    """Bot id encoded in a lock/state/log file name, or None."""
+    m = pattern.fullmatch(name)
+    if m is None:
+        return None
+    return m.group(m.lastindex)
+
+
+def _discover_bots(listings: dict = None) -> list:
+    """Find all bot IDs from lock/state files (directory scans are kept in listings)."""
     bot_ids = set()
     basedir = os.environ.get("CAPBOT_BASEDIR", "").strip()
 
@@ -142,35 +238,118 @@ def _discover_bots() -> list:
     else:
         dirs = [Path.home()]
 
+    if listings is None:
+        listings = {}
     for d in dirs:
-        if not d.exists():
-            continue
-        for f in d.iterdir():
-            name = f.name
-            if name.startswith(".capbot_lock_") and name.endswith(".lock"):
-                bot_ids.add(name[len(".capbot_lock_"):-len(".lock")])
-            elif name.startswith(".capbot_state_") and name.endswith(".json"):
-                bot_ids.add(name[len(".capbot_state_"):-len(".json")])
+        if d not in listings:
+            listings[d] = _scan_dir(d)
+        for name in listings[d]:
+            bid = _bot_id_from_name(name, _BOT_FILE_RE)
+            if bid is not None:
+                bot_ids.add(bid)
 
     return sorted(bot_ids)
 
 
+def _status_key(r: dict) -> tuple:
+    """What --watch compares between checks (ages and other counters left out)."""
+    return (
+        r["healthy"], r["running"], r["pid"], r["in_position"], r["deal_id"],
+        r["cooldown_active"], r["consec_losses"],
+        tuple(re.sub(r"\d+s old", "", i) for i in r["issues"]),
+    )
+
+
+def watch_forever(bot_ids: list, interval: float = 60.0) -> None:
+    """
+    Print status changes as they happen. With inotify_simple installed, changes to
+    lock/state/log files wake the loop and only the affected bot is re-checked;
+    every bot is still re-checked each interval (dead PIDs and staleness make no
+    file events). Without it, every bot is re-checked each interval.
+    """
+    state_cache = {}
+    by_safe = {_safe_id(b): b for b in bot_ids}
+    last = {}
+
+    def _report(bid: str) -> None:
+        r = _check_bot(bid, state_cache=state_cache)
+        key = _status_key(r)
+        if last.get(bid) == key:
+            return
+        last[bid] = key
+        icon = "\u2705" if r["healthy"] else "\u274c"
+        ts = datetime.now(timezone.utc).strftime("%H:%M:%S")
+        detail = "OK" if r["healthy"] else "; ".join(r["issues"])
+        print(f"[{ts}] {icon} {bid}: {detail}", flush=True)
+
+    for bid in bot_ids:
+        _report(bid)
+
+    inotify = None
+    if INotify is not None:
+        inotify = INotify()
+        mask = _in_flags.MODIFY | _in_flags.CREATE | _in_flags.DELETE | _in_flags.MOVED_TO
+        for d in set(_bot_dirs()):
+            try:
+                inotify.add_watch(str(d), mask)
+            except OSError:
+                pass
+
+    next_full = time.monotonic() + interval
+    while True:
+        if inotify is None:
+            time.sleep(max(0.0, next_full - time.monotonic()))
+        else:
+            wait_ms = max(0, int((next_full - time.monotonic()) * 1000))
+            # read_delay coalesces bursts of log writes into one wakeup
+            touched = set()
+            for ev in inotify.read(timeout=wait_ms, read_delay=200):
+                bid = by_safe.get(_bot_id_from_name(ev.name or ""))
+                if bid is not None:
+                    touched.add(bid)
+            for bid in sorted(touched):
+                _report(bid)
+        if time.monotonic() >= next_full:
+            for bid in bot_ids:
+                _report(bid)
+            next_full = time.monotonic() + interval
+
+
 def main():
     ap = argparse.ArgumentParser(description="Check health of capbot instances")
     ap.add_argument("--bot-id", nargs="*", help="Specific bot IDs to check (default: auto-discover)")
     ap.add_argument("--json", action="store_true", help="Output as JSON")
     ap.add_argument("--telegram", action="store_true", help="Send report via Telegram")
+    ap.add_argument("--watch", action="store_true", help="Keep running and print status changes")
+    ap.add_argument("--interval", type=float, default=60.0, help="Full re-check period for --watch (seconds)")
     args = ap.parse_args()
 
-    bot_ids = args.bot_id or _discover_bots()
+    now_utc = datetime.now(timezone.utc)
+    now = now_utc.timestamp()
+    listings = {}
+    bot_ids = args.bot_id or _discover_bots(listings)
 
     if not bot_ids:
         print("No bots found.")
         return
 
-    results = []
-    for bid in bot_ids:
-        results.append(_check_bot(bid))
+    if args.watch:
+        try:
+            watch_forever(bot_ids, args.interval)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    # scan the directories up front so the worker threads only read listings
+    for d in _bot_dirs():
+        if d not in listings:
+            listings[d] = _scan_dir(d)
+    # each check is a few stat/read syscalls; run them side by side
+    with ThreadPoolExecutor(max_workers=min(32, len(bot_ids))) as ex:
+        results = list(ex.map(
+            lambda bid: _check_bot(bid, listings=listings, now=now),
+            bot_ids,
+        ))
 
     if args.json:
         print(json.dumps(results, indent=2, default=str))
@@ -178,7 +357,7 @@ def main():
 
     # Pretty print
     print(f"\n{'='*60}")
-    print(f"  CAPBOT HEALTH CHECK  ({datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')})")
+    print(f"  CAPBOT HEALTH CHECK  ({now_utc.strftime('%Y-%m-%d %H:%M UTC')})")
     print(f"{'='*60}\n")
 
     for r in results:
@@ -192,7 +371,8 @@ def main():
             print(f"     Position: flat")
 
         if r["state_age_sec"] is not None:
-            print(f"     State: {r['state_age_sec']}s ago | Log: {r.get('log_age_sec', '?')}s ago")
+            log_age = r.get("log_age_sec")
+            print(f"     State: {r['state_age_sec']}s ago | Log: {'?' if log_age is None else log_age}s ago")
 
         if r["consec_losses"] > 0:
             print(f"     Consecutive losses: {r['consec_losses']}")
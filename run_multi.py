@@ -4,6 +4,7 @@ Multi-bot launcher for capbot.
 
 Usage:
   python run_multi.py configs/de40_5m_vwap.json configs/sp500_strategy.json
+  python run_multi.py --log-dir logs configs/de40_5m_vwap.json  # bot output to logs/capbot_multi_<name>.log
 
 Each config runs as an independent subprocess with its own:
   - Capital.com credentials (via per-bot secrets file)
@@ -15,6 +16,7 @@ The launcher monitors all bots and restarts crashed ones automatically.
 """
 import argparse
 import os
+import selectors
 import signal
 import subprocess
 import sys
@@ -22,14 +24,22 @@ import time
 from pathlib import Path
 
 
-def _launch_bot(config_path: str, secrets_path: str = None) -> subprocess.Popen:
-    """Launch a single bot subprocess."""
+def _launch_bot(config_path: str, secrets_path: str = None, log_path: str = None) -> subprocess.Popen:
+    """Launch a single bot subprocess (output piped to us, or appended to log_path)."""
     cmd = [sys.executable, "run_bot.py", "run", "--config", config_path]
     if secrets_path:
         cmd.extend(["--secrets", secrets_path])
 
     env = os.environ.copy()
 
+    if log_path:
+        # the child writes straight to its own file; nothing passes through this process
+        fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            return subprocess.Popen(cmd, stdout=fd, stderr=subprocess.STDOUT, env=env)
+        finally:
+            os.close(fd)
+
     proc = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
@@ -41,6 +51,48 @@ def _launch_bot(config_path: str, secrets_path: str = None) -> subprocess.Popen:
     return proc
 
 
+def _watch(sel: selectors.BaseSelector, cfg_path: str, proc: subprocess.Popen):
+    """Register a bot's stdout and (on Linux) a pidfd for its exit with the selector."""
+    if proc.stdout is not None:
+        os.set_blocking(proc.stdout.fileno(), False)
+        sel.register(proc.stdout, selectors.EVENT_READ, ("stdout", cfg_path))
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+            sel.register(pidfd, selectors.EVENT_READ, ("exit", cfg_path))
+        except OSError:
+            pidfd = None
+    return pidfd
+
+
+def _unwatch(sel: selectors.BaseSelector, proc: subprocess.Popen, pidfd) -> None:
+    for fobj in (proc.stdout, pidfd):
+        if fobj is None:
+            continue
+        try:
+            sel.unregister(fobj)
+        except (KeyError, ValueError):
+            pass
+    if pidfd is not None:
+        os.close(pidfd)
+
+
+def _read_available(fd: int):
+    """(bytes currently in the pipe, eof) without blocking."""
+    chunks = []
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except BlockingIOError:
+            return b"".join(chunks), False
+        except OSError:
+            return b"".join(chunks), True
+        if not chunk:
+            return b"".join(chunks), True
+        chunks.append(chunk)
+
+
 def _config_name(path: str) -> str:
     """Extract a short name from config path for display."""
     return Path(path).stem
@@ -52,8 +104,16 @@ def main():
     ap.add_argument("--secrets", default=None, help="Shared secrets file (default: ~/.capital_secrets.md)")
     ap.add_argument("--restart-delay", type=int, default=10, help="Seconds to wait before restarting crashed bot")
     ap.add_argument("--no-restart", action="store_true", help="Don't restart crashed bots")
+    ap.add_argument("--log-dir", default=None,
+                    help="Append each bot's output to <dir>/capbot_multi_<name>.log instead of printing it here")
     args = ap.parse_args()
 
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    def _log_path(name: str):
+        return os.path.join(args.log_dir, f"capbot_multi_{name}.log") if args.log_dir else None
+
     procs = {}  # config_path -> (Popen, name)
     running = True
 
@@ -72,6 +132,10 @@ def main():
     signal.signal(signal.SIGINT, _signal_handler)
     signal.signal(signal.SIGTERM, _signal_handler)
 
+    sel = selectors.DefaultSelector()
+    pidfds = {}   # config_path -> pidfd (None when pidfd_open is unavailable)
+    partial = {}  # config_path -> bytearray with the unterminated output tail
+
     # Launch all bots
     for cfg_path in args.configs:
         if not Path(cfg_path).exists():
@@ -79,9 +143,12 @@ def main():
             continue
 
         name = _config_name(cfg_path)
-        proc = _launch_bot(cfg_path, args.secrets)
+        proc = _launch_bot(cfg_path, args.secrets, _log_path(name))
         procs[cfg_path] = (proc, name)
-        print(f"[MULTI] Started {name} (PID {proc.pid}) from {cfg_path}")
+        pidfds[cfg_path] = _watch(sel, cfg_path, proc)
+        partial[cfg_path] = bytearray()
+        where = f", output -> {_log_path(name)}" if args.log_dir else ""
+        print(f"[MULTI] Started {name} (PID {proc.pid}) from {cfg_path}{where}")
 
     if not procs:
         print("[MULTI] No bots started. Exiting.")
@@ -89,51 +156,73 @@ def main():
 
     print(f"[MULTI] {len(procs)} bot(s) running. Press Ctrl+C to stop all.")
 
-    # Monitor loop
-    while running:
-        time.sleep(5)
+    def _handle_exit(cfg_path: str, ret: int) -> None:
+        proc, name = procs[cfg_path]
+        _unwatch(sel, proc, pidfds.pop(cfg_path, None))
 
-        for cfg_path in list(procs.keys()):
-            proc, name = procs[cfg_path]
-            ret = proc.poll()
+        # Drain remaining output (non-blocking: a grandchild may still hold the pipe)
+        if proc.stdout is not None:
+            try:
+                data, _ = _read_available(proc.stdout.fileno())
+                remaining = (partial.pop(cfg_path, b"") + data).decode("utf-8", "replace")
+                if remaining:
+                    for line in remaining.strip().split("\n"):
+                        print(f"[{name}] {line}")
+                proc.stdout.close()
+            except Exception:
+                pass
 
-            if ret is not None:
-                # Bot exited
-                # Drain remaining output
+        if ret == 0:
+            print(f"[MULTI] {name} exited normally (code 0)")
+        else:
+            print(f"[MULTI] {name} CRASHED (code {ret})")
+
+        if not args.no_restart and running:
+            print(f"[MULTI] Restarting {name} in {args.restart_delay}s...")
+            time.sleep(args.restart_delay)
+            new_proc = _launch_bot(cfg_path, args.secrets, _log_path(name))
+            procs[cfg_path] = (new_proc, name)
+            pidfds[cfg_path] = _watch(sel, cfg_path, new_proc)
+            partial[cfg_path] = bytearray()
+            print(f"[MULTI] Restarted {name} (new PID {new_proc.pid})")
+        else:
+            del procs[cfg_path]
+
+    # Monitor loop: block until a bot prints or exits. Without pidfds (non-Linux,
+    # old kernels) fall back to checking exits every 5s.
+    while running:
+        timeout = None if all(fd is not None for fd in pidfds.values()) else 5
+        exited = set()
+        for key, _ in sel.select(timeout=timeout):
+            tag, cfg_path = key.data
+            if cfg_path not in procs:
+                continue
+            proc, name = procs[cfg_path]
+            if tag == "exit":
+                exited.add(cfg_path)
+                continue
+            data, eof = _read_available(proc.stdout.fileno())
+            buf = partial[cfg_path]
+            buf += data
+            if b"\n" in buf:
+                *lines, tail = buf.split(b"\n")
+                partial[cfg_path] = bytearray(tail)
+                for line in lines:
+                    print(f"[{name}] {line.decode('utf-8', 'replace').rstrip()}")
+            if eof:
+                # the bot closed stdout, normally because it is exiting
                 try:
-                    remaining = proc.stdout.read()
-                    if remaining:
-                        for line in remaining.strip().split("\n"):
-                            print(f"[{name}] {line}")
-                except Exception:
+                    sel.unregister(proc.stdout)
+                except (KeyError, ValueError):
                     pass
+                exited.add(cfg_path)
 
-                if ret == 0:
-                    print(f"[MULTI] {name} exited normally (code 0)")
-                else:
-                    print(f"[MULTI] {name} CRASHED (code {ret})")
-
-                if not args.no_restart and running:
-                    print(f"[MULTI] Restarting {name} in {args.restart_delay}s...")
-                    time.sleep(args.restart_delay)
-                    new_proc = _launch_bot(cfg_path, args.secrets)
-                    procs[cfg_path] = (new_proc, name)
-                    print(f"[MULTI] Restarted {name} (new PID {new_proc.pid})")
-                else:
-                    del procs[cfg_path]
-
-            else:
-                # Bot still running - print any new output
-                try:
-                    import select
-                    if hasattr(select, "select"):
-                        readable, _, _ = select.select([proc.stdout], [], [], 0)
-                        if readable:
-                            line = proc.stdout.readline()
-                            if line:
-                                print(f"[{name}] {line.rstrip()}")
-                except Exception:
-                    pass
+        for cfg_path in list(procs.keys()):
+            proc, _ = procs[cfg_path]
+            if cfg_path in exited or pidfds.get(cfg_path) is None:
+                ret = proc.poll()
+                if ret is not None:
+                    _handle_exit(cfg_path, ret)
 
         if not procs:
             print("[MULTI] All bots have exited. Shutting down.")
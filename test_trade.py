@@ -9,27 +9,187 @@ Usage:
 
 Options:
   --config   Config file (required - uses epic + account from it)
-  --wait     Seconds to hold position (default: 300 = 5 min)
+  --wait     Seconds to hold position (default: 300 = 5 min; Ctrl+C closes early)
   --size     Trade size (default: 1)
   --direction  BUY or SELL (default: BUY)
+
+Environment:
+  TRADING_CPU  Pin the script to this CPU (and SCHED_FIFO if permitted), Linux only
 """
 import argparse
+import itertools
 import json
 import os
+import signal
 import sys
+import threading
 import time
+from functools import lru_cache
+
+
+_CURRENCY_SYMBOLS = {
+    "USD": "$", "USDD": "$",
+    "EUR": "€", "EURD": "€",
+    "GBP": "£", "GBPD": "£",
+    "CHF": "CHF ", "CHFD": "CHF ",
+    "JPY": "¥", "JPYD": "¥",
+    "AUD": "A$", "AUDD": "A$",
+    "CAD": "C$", "CADD": "C$",
+}
+
+
+def _resolve_ccy(raw_ccy: str):
+    """(ISO code, symbol) for a Capital.com account currency; demo codes carry a trailing 'D' (USDD)."""
+    code = raw_ccy[:-1] if len(raw_ccy) == 4 and raw_ccy.endswith("D") else raw_ccy
+    return code, _CURRENCY_SYMBOLS.get(raw_ccy) or _CURRENCY_SYMBOLS.get(code, code + " ")
+
+
+_CCY_RESOLVE = {k: _resolve_ccy(k) for k in _CURRENCY_SYMBOLS}
+
+
+def _pin_to_trading_cpu() -> None:
+    """
+    TRADING_CPU=<n> (Linux): run on CPU n only, and under SCHED_FIFO when the
+    process is allowed to (CAP_SYS_NICE), so the close is not delayed by other
+    work on the box. Best-effort: any refusal just leaves normal scheduling.
+    """
+    cpu = os.environ.get("TRADING_CPU", "").strip()
+    if not cpu or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, {int(cpu)})
+        print(f"Pinned to CPU {cpu}")
+    except (ValueError, OSError) as e:
+        print(f"TRADING_CPU={cpu} ignored: {e}")
+        return
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+        print("Scheduler: SCHED_FIFO prio 50")
+    except (AttributeError, OSError) as e:
+        print(f"SCHED_FIFO not set: {e}")
 
-from capbot.broker.capital_client import CapitalClient
 
-try:
-    from capbot.app.notifier import email_event
-except ImportError:
-    def email_event(*args, **kwargs): pass
+def _noop_event(*args, **kwargs):
+    pass
 
-try:
-    from capbot.app.telegram_notifier import telegram_event
-except ImportError:
-    def telegram_event(*args, **kwargs): pass
+
+@lru_cache(maxsize=None)
+def _load_notifiers():
+    """(email_event, telegram_event); imported lazily so --help and bad args stay fast."""
+    try:
+        from capbot.app.notifier import email_event
+    except ImportError:
+        email_event = _noop_event
+    try:
+        from capbot.app.telegram_notifier import telegram_event
+    except ImportError:
+        telegram_event = _noop_event
+    return email_event, telegram_event
+
+
+def _index_positions(positions) -> dict:
+    """{epic: position item} from a /positions payload (first item per epic)."""
+    out = {}
+    for p in (positions or {}).get("positions", []):
+        out.setdefault(p.get("market", {}).get("epic"), p)
+    return out
+
+
+def _await_fill(client, deal_ref, epic: str, timeout: float = 15.0):
+    """
+    Wait for a just-opened market order. The confirm and the positions list are
+    polled side by side: the position's dealId (which differs from the confirm's)
+    is what we need, the confirm is only reported, from a daemon thread that
+    is never waited on. Returns (deal_id, level).
+    """
+    from capbot.broker.capital_client import poll_delay
+
+    def _confirm():
+        try:
+            conf = client.confirm(deal_ref, timeout_sec=10) if deal_ref else None
+        except Exception as e:
+            print(f"WARNING: Confirm failed: {e!r}")
+            return
+        if conf and conf.get("dealId"):
+            print(f"Confirmed: status={conf.get('dealStatus', '?')} entry={conf.get('level', '?')}")
+        else:
+            print("WARNING: Could not get confirm response, checking positions...")
+
+    def _position():
+        deadline = time.monotonic() + timeout
+        for attempt in itertools.count():
+            try:
+                pos = _index_positions(client.get_positions()).get(epic, {}).get("position", {})
+            except Exception:
+                pos = {}
+            deal_id, level = pos.get("dealId"), pos.get("level")
+            if deal_id:
+                print(f"Position found: deal_id={deal_id} entry={level}")
+                return deal_id, level
+            if time.monotonic() >= deadline:
+                return None, None
+            time.sleep(poll_delay(attempt))
+
+    threading.Thread(target=_confirm, name="confirm", daemon=True).start()
+    return _position()
+
+
+def _hold(client, wait_s: float, countdown: bool, keepalive_sec: float = 60.0) -> bool:
+    """
+    Wait wait_s seconds, waking only to print the 10s countdown (when someone
+    is watching a terminal) and to ping the broker every keepalive_sec, so the
+    session is still valid for the close after a long hold. Ctrl+C ends the
+    hold early so the position is closed right away. Returns True if cancelled.
+    """
+    cancel = threading.Event()
+    prev = signal.signal(signal.SIGINT, lambda *_: cancel.set())
+    try:
+        now = time.monotonic()
+        end = now + max(0, wait_s)
+        next_print = now if countdown else float("inf")
+        next_ping = now + keepalive_sec if wait_s > keepalive_sec else float("inf")
+        while now < end:
+            if now >= next_print:
+                print(f"  {int(round(end - now))}s remaining...")
+                next_print += 10
+            if now >= next_ping:
+                client.ping()
+                next_ping += keepalive_sec
+            if cancel.wait(max(0.0, min(end, next_print, next_ping) - now)):
+                return True
+            now = time.monotonic()
+        return False
+    finally:
+        signal.signal(signal.SIGINT, prev)
+
+
+def _await_close(client, close_deal_ref, epic: str, timeout: float = 5.0):
+    """
+    After close_position: an ACCEPTED close confirm settles it. Only when the
+    confirm is missing or inconclusive, poll positions until the epic's position
+    is gone (up to timeout). Returns (still_open, close_conf or None).
+    """
+    from capbot.broker.capital_client import poll_delay
+
+    close_conf = None
+    if close_deal_ref:
+        try:
+            close_conf = client.confirm(str(close_deal_ref), timeout_sec=10)
+        except Exception:
+            close_conf = None
+    if close_conf and str(close_conf.get("dealStatus") or "").upper() == "ACCEPTED":
+        return False, close_conf
+
+    deadline = time.monotonic() + timeout
+    for attempt in itertools.count():
+        try:
+            if epic not in _index_positions(client.get_positions()):
+                return False, close_conf
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            return True, close_conf
+        time.sleep(poll_delay(attempt))
 
 
 def main():
@@ -39,9 +199,10 @@ def main():
     parser.add_argument("--size", type=float, default=1.0, help="Trade size (default 1)")
     parser.add_argument("--direction", default="BUY", choices=["BUY", "SELL"], help="Direction (default BUY)")
     args = parser.parse_args()
+    _pin_to_trading_cpu()
 
-    with open(args.config) as f:
-        cfg = json.load(f)
+    from capbot.app.config import load_config
+    cfg = load_config(args.config).raw
 
     epic = cfg["market"]["epic"]
     account_id = cfg.get("account", {}).get("account_id")
@@ -51,6 +212,8 @@ def main():
     print(f"Direction: {args.direction} | Size: {args.size} | Wait: {args.wait}s")
     print()
 
+    from capbot.broker.capital_client import CapitalClient, to_number
+
     # Login
     print("Logging in to Capital.com...")
     client = CapitalClient()
@@ -59,91 +222,59 @@ def main():
     print("Login OK")
 
     # Get account currency
-    _CURRENCY_SYMBOLS = {
-        "USD": "$", "USDD": "$",
-        "EUR": "€", "EURD": "€",
-        "GBP": "£", "GBPD": "£",
-        "CHF": "CHF ", "CHFD": "CHF ",
-        "JPY": "¥", "JPYD": "¥",
-        "AUD": "A$", "AUDD": "A$",
-        "CAD": "C$", "CADD": "C$",
-    }
     account_currency = "USD"
     currency_symbol = "$"
     try:
         sess_info = client.get_session()
         raw_ccy = (sess_info.get("currency") or "USD").upper()
-        account_currency = raw_ccy.rstrip("D") if len(raw_ccy) == 4 and raw_ccy.endswith("D") else raw_ccy
-        currency_symbol = _CURRENCY_SYMBOLS.get(raw_ccy, _CURRENCY_SYMBOLS.get(account_currency, account_currency + " "))
+        account_currency, currency_symbol = _CCY_RESOLVE.get(raw_ccy) or _resolve_ccy(raw_ccy)
         print(f"Account currency: {raw_ccy} -> {account_currency} ({currency_symbol.strip()})")
     except Exception:
         print("Could not detect account currency, defaulting to USD")
 
     # Check no existing position
-    positions = client.get_positions()
-    pos_list = (positions or {}).get("positions", [])
-    for p in pos_list:
-        mkt = p.get("market", {})
-        if mkt.get("epic") == epic:
-            deal_id = p.get("position", {}).get("dealId")
-            print(f"WARNING: Already have open position on {epic} (deal_id={deal_id})")
-            print("Close it first or use a different epic.")
-            sys.exit(1)
-
-    # Open position
+    existing = _index_positions(client.get_positions()).get(epic)
+    if existing is not None:
+        deal_id = existing.get("position", {}).get("dealId")
+        print(f"WARNING: Already have open position on {epic} (deal_id={deal_id})")
+        print("Close it first or use a different epic.")
+        sys.exit(1)
+
+    # Open position (on a warm connection: the handshake should not sit between us and the fill)
+    client.prewarm()
     print(f"\nOpening {args.direction} {args.size} on {epic}...")
     resp = client.open_market(epic, args.direction, args.size)
     deal_ref = resp.get("dealReference")
     print(f"Order response: dealReference={deal_ref}")
 
-    # Wait for confirm
-    for attempt in range(10):
-        time.sleep(1)
-        conf = client.confirm(deal_ref, timeout_sec=10)
-        if conf and conf.get("dealId"):
-            status = conf.get("dealStatus", "?")
-            level = conf.get("level", "?")
-            print(f"Confirmed: status={status} entry={level}")
-            break
-    else:
-        print("WARNING: Could not get confirm response, checking positions...")
-
-    # Get the REAL deal_id from positions (confirm dealId differs from position dealId)
-    deal_id = None
-    for attempt in range(5):
-        time.sleep(1)
-        positions = client.get_positions()
-        for p in (positions or {}).get("positions", []):
-            mkt = p.get("market", {})
-            if mkt.get("epic") == epic:
-                deal_id = p.get("position", {}).get("dealId")
-                level = p.get("position", {}).get("level")
-                print(f"Position found: deal_id={deal_id} entry={level}")
-                break
-        if deal_id:
-            break
+    deal_id, level = _await_fill(client, deal_ref, epic)
 
     if not deal_id:
         print("ERROR: Could not find position. Check Capital.com manually.")
         sys.exit(1)
 
     # Notify: test trade opened
-    entry_price = float(level) if level else 0
+    entry_price = to_number(level) if level else 0
     notify_payload = {
         "epic": epic, "direction": args.direction, "size": args.size,
         "deal_id": deal_id, "entry_price": entry_price, "account_id": account_id,
         "sl": "N/A (test)", "tp": "N/A (test)",
         "currency": account_currency, "currency_symbol": currency_symbol,
     }
+    # notifier modules are first needed here, after the order is already in
+    email_event, telegram_event = _load_notifiers()
+    # email_event only queues onto the notifier's sender thread (flushed at exit);
+    # telegram posts inline, so it gets a pool that is waited for at the end
+    from concurrent.futures import ThreadPoolExecutor
+    notify_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notify")
     email_event(True, bot_id, "TRADE_OPEN", notify_payload)
-    telegram_event(bot_id, "TRADE_OPEN", notify_payload)
-    print("Notifications sent (TRADE_OPEN)")
+    notify_pool.submit(telegram_event, bot_id, "TRADE_OPEN", notify_payload)
+    print("Notifications queued (TRADE_OPEN)")
 
     # Wait
     print(f"\nPosition open. Waiting {args.wait} seconds...")
-    for remaining in range(args.wait, 0, -10):
-        print(f"  {remaining}s remaining...")
-        time.sleep(min(10, remaining))
+    if _hold(client, args.wait, countdown=sys.stdout.isatty()):
+        print("Hold cancelled, closing now.")
 
     # ── Step 1: Read position UPL BEFORE close (exact Capital.com P&L) ──
     broker_profit = None
@@ -168,31 +299,22 @@ def main():
     close_resp = client.close_position(deal_id)
     print(f"Close response: {close_resp}")
 
-    # Verify closed
-    time.sleep(2)
-    positions = client.get_positions()
-    still_open = False
-    for p in (positions or {}).get("positions", []):
-        mkt = p.get("market", {})
-        if mkt.get("epic") == epic:
-            still_open = True
+    # Close confirm first; re-read positions only if it is not ACCEPTED
+    close_deal_ref = (close_resp or {}).get("dealReference")
+    still_open, close_conf = _await_close(client, close_deal_ref, epic)
 
     if still_open:
         print("WARNING: Position may still be open. Check Capital.com.")
     else:
         # ── Get broker exit price from confirm ──
-        close_deal_ref = (close_resp or {}).get("dealReference")
         exit_price = entry_price
-        if close_deal_ref:
-            time.sleep(1)
-            close_conf = client.confirm(str(close_deal_ref), timeout_sec=10)
-            if close_conf:
-                print(f"Broker confirm response (FULL): {json.dumps(close_conf)}")
-                if close_conf.get("level"):
-                    exit_price = float(close_conf["level"])
-                if close_conf.get("profit") is not None:
-                    broker_profit = round(float(close_conf["profit"]), 2)
-                    print(f"Broker confirm profit: {broker_profit}")
+        if close_conf:
+            print(f"Broker confirm response (FULL): {json.dumps(close_conf)}")
+            if close_conf.get("level"):
+                exit_price = to_number(close_conf["level"])
+            if close_conf.get("profit") is not None:
+                broker_profit = round(to_number(close_conf["profit"]), 2)
+                print(f"Broker confirm profit: {broker_profit}")
 
         # ── Fallback: Balance snapshot ──
         if broker_profit is None and balance_before is not None:
@@ -228,9 +350,10 @@ def main():
             "currency": account_currency, "currency_symbol": currency_symbol,
         }
         email_event(True, bot_id, "EXIT_TP", close_payload)
-        telegram_event(bot_id, "EXIT_TP", close_payload)
-        print("Notifications sent (EXIT)")
+        notify_pool.submit(telegram_event, bot_id, "EXIT_TP", close_payload)
+        print("Notifications queued (EXIT)")
 
+    notify_pool.shutdown(wait=True)
     print("\nTest trade complete.")
 
 
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from capbot.data import indicators
+from capbot.strategies import _kernels
+
+N = 5
+
+INPUTS = {
+    "empty": np.array([], dtype=np.float64),
+    "short": np.array([1.0, 2.0, 3.0]),
+    "exact": np.array([1.0, 2.0, 3.0, 4.0, 5.0]),
+    "nan": np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0, np.nan, 13.0]),
+    "long": np.sin(np.arange(40.0)) * 10.0 + 100.0,
+}
+
+HELPERS = {
+    "move_mean": "mean",
+    "move_sum": "sum",
+    "move_std": "std",
+    "move_max": "max",
+}
+
+BACKENDS = ["bottleneck", "numba", "numpy"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    name = request.param
+    if name == "bottleneck" and not _kernels._HAVE_BN:
+        pytest.skip("bottleneck not installed")
+    if name == "numba" and not _kernels._HAVE_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(_kernels, "_HAVE_BN", name == "bottleneck")
+    monkeypatch.setattr(_kernels, "_HAVE_NUMBA", name != "numpy" and _kernels._HAVE_NUMBA)
+    return name
+
+
+@pytest.mark.parametrize("helper", sorted(HELPERS))
+@pytest.mark.parametrize("case", sorted(INPUTS))
+def test_move_matches_pandas_rolling(backend, helper, case):
+    a = INPUTS[case]
+    got = getattr(_kernels, helper)(a, N)
+    want = getattr(pd.Series(a).rolling(N, min_periods=N), HELPERS[helper])().to_numpy()
+    assert got.shape == a.shape
+    np.testing.assert_allclose(got, want, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+
+@pytest.fixture(params=[True, False], ids=["bottleneck", "pandas"])
+def indicators_bn(request, monkeypatch):
+    if request.param and indicators.bn is None:
+        pytest.skip("bottleneck not installed")
+    if not request.param:
+        monkeypatch.setattr(indicators, "bn", None)
+    return request.param
+
+
+def _bars(n):
+    close = np.sin(np.arange(float(n))) * 5.0 + 100.0
+    return pd.DataFrame(
+        {
+            "open": close - 0.5,
+            "high": close + 1.0,
+            "low": close - 1.0,
+            "close": close,
+        },
+        index=pd.date_range("2024-01-02 14:30", periods=n, freq="5min", tz="UTC"),
+    )
+
+
+@pytest.mark.parametrize("case", sorted(INPUTS))
+def test_rolling_mean_matches_pandas(indicators_bn, case):
+    s = pd.Series(INPUTS[case])
+    got = indicators._rolling_mean(s, N)
+    pd.testing.assert_series_equal(got, s.rolling(N).mean(), check_dtype=False)
+
+
+@pytest.mark.parametrize("n", [0, 3, 14, 30])
+def test_rsi_atr_short_inputs(indicators_bn, n):
+    df = _bars(n)
+    r = indicators.rsi(df["close"], 14)
+    a = indicators.atr(df, 14)
+    assert r.index.equals(df.index)
+    assert a.index.equals(df.index)
+    if n < 15:
+        assert r.isna().all()
+    if n < 14:
+        assert a.isna().all()
+    if n == 30:
+        assert r.iloc[14:].notna().all()
+        assert a.iloc[13:].notna().all()
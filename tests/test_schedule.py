@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from capbot.domain import schedule
+
+ZONES = ["Europe/Berlin", "America/New_York", "Europe/London", "UTC"]
+
+
+def _instants():
+    # hourly UTC instants across several DST changes, plus a few instants outside that range
+    idx = pd.date_range("2019-01-01", "2026-12-31", freq="h", tz="UTC")
+    extra = pd.DatetimeIndex(["1950-06-01", "1970-01-01", "2037-07-01", "2037-12-01"], tz="UTC")
+    return idx.append(extra).as_unit("ns")
+
+
+def _expected(idx, tz_name):
+    local = idx.tz_convert(tz_name)
+    return np.array([int(t.utcoffset().total_seconds()) * 1_000_000_000 for t in local], dtype=np.int64)
+
+
+@pytest.mark.parametrize("tz_name", ZONES)
+def test_utc_offsets_ns_matches_tz_convert(tz_name):
+    idx = _instants()
+    got = schedule.utc_offsets_ns(tz_name, idx.asi8)
+    np.testing.assert_array_equal(got, _expected(idx, tz_name))
+
+
+@pytest.mark.parametrize("tz_name", ZONES)
+def test_utc_offset_ns_matches_tz_convert(tz_name):
+    schedule._OFFSET_SEGMENT.pop(tz_name, None)
+    idx = _instants()
+    got = np.array([schedule.utc_offset_ns(tz_name, int(ns)) for ns in idx.asi8], dtype=np.int64)
+    np.testing.assert_array_equal(got, _expected(idx, tz_name))
+
+
+def test_utc_offset_ns_around_transition():
+    # Europe/Berlin springs forward at 2024-03-31 01:00 UTC
+    edge = pd.Timestamp("2024-03-31 01:00", tz="UTC").value
+    schedule._OFFSET_SEGMENT.pop("Europe/Berlin", None)
+    assert schedule.utc_offset_ns("Europe/Berlin", edge - 1) == 3600 * 1_000_000_000
+    assert schedule.utc_offset_ns("Europe/Berlin", edge) == 7200 * 1_000_000_000
+    assert schedule.utc_offset_ns("Europe/Berlin", edge - 1) == 3600 * 1_000_000_000